@@ -9,7 +9,7 @@ except Exception:
 
 import streamlit as st
 import json, tempfile
-from pipeline import process_youtube, process_video_file
+from pipeline import process_youtube, process_video_file, process_video_stream
 
 st.set_page_config(page_title="Responsible Gaming Shorts MVP", layout="wide")
 st.title("Responsible Gaming Shorts — Classifier MVP")
@@ -41,7 +41,33 @@ if mode == "YouTube URL":
 
 else:
     up = st.file_uploader("Upload a short video (.mp4)", type=["mp4"])
-    if up is not None and st.button("Analyze upload"):
+    long_form = st.checkbox("Long video / VOD (process in 60s windows)")
+    if up is not None and long_form and st.button("Analyze upload"):
+        with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp:
+            tmp.write(up.read())
+            tmp_path = tmp.name
+        try:
+            progress = st.empty()
+            for part in process_video_stream(tmp_path):
+                if part["type"] == "window":
+                    progress.write(f"Processed up to {part['end']:.0f}s — running score {part['overall']}")
+                    for cat, name in part["new_flags"]:
+                        st.write(f"- **{cat}**: {name} (at {part['start']:.0f}s)")
+                    if part["rep_frame"]:
+                        st.image(part["rep_frame"], width=240)
+                else:
+                    st.success("Done.")
+                    st.subheader(f"Overall risk score: {part['overall']}")
+                    st.json(part["categories"])
+                    st.write("Flags:")
+                    for cat, name in part["flags"]:
+                        st.write(f"- **{cat}**: {name}")
+                    st.write("Flag timestamps (window start, seconds):")
+                    st.json(part["flag_times"])
+        except Exception as e:
+            st.error(str(e))
+        os.unlink(tmp_path)
+    elif up is not None and not long_form and st.button("Analyze upload"):
         with tempfile.NamedTemporaryFile(delete=False, suffix=".mp4") as tmp:
             tmp.write(up.read())
             tmp_path = tmp.name
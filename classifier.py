@@ -0,0 +1,180 @@
+"""Batched inference for the DistilBERT model from `models/transcript_classifier.py`.
+
+The model is loaded once and can run as plain fp32 torch, dynamically
+quantized int8 (CPU), or an exported ONNX graph (needs `onnxruntime`).
+Texts longer than the model window are split into overlapping windows and a
+label's score is its max over windows, so a phrase late in a long transcript
+is still seen.
+
+Per-label thresholds are read from `thresholds.json` in the model directory
+when present (label -> float), otherwise every label uses 0.5.
+
+Compare fp32 and int8 on a labeled JSONL (or dataset_store .db):
+
+    python classifier.py model_out_dir dataset.jsonl
+"""
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence, Set
+
+import numpy as np
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+# Label order used by models/transcript_classifier.py; only needed for models
+# saved before the label names were written into the config.
+DEFAULT_LABELS = [
+    "missing_disclaimer",
+    "offshore_reference",
+    "risk_free",
+    "chasing_losses",
+    "solve_financial_problems",
+    "vpn_proxy",
+]
+
+BACKENDS = ("fp32", "int8", "onnx")
+
+
+class TranscriptClassifier:
+    def __init__(
+        self,
+        model_dir: Path,
+        backend: str = "int8",
+        thresholds: Dict[str, float] | None = None,
+        max_length: int = 256,
+        stride: int = 64,
+    ) -> None:
+        if backend not in BACKENDS:
+            raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+        self.model_dir = Path(model_dir)
+        self.backend = backend
+        self.max_length = max_length
+        self.stride = stride
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_dir)
+        model = AutoModelForSequenceClassification.from_pretrained(self.model_dir).eval()
+
+        id2label = model.config.id2label or {}
+        names = [id2label.get(i, "") for i in range(model.config.num_labels)]
+        if any(n.startswith("LABEL_") or not n for n in names) and len(DEFAULT_LABELS) == len(names):
+            names = list(DEFAULT_LABELS)
+        self.labels: List[str] = names
+
+        self.thresholds = {lbl: 0.5 for lbl in self.labels}
+        thr_path = self.model_dir / "thresholds.json"
+        if thr_path.exists():
+            self.thresholds.update(json.loads(thr_path.read_text()))
+        if thresholds:
+            self.thresholds.update(thresholds)
+
+        self._session = None
+        if backend == "int8":
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        elif backend == "onnx":
+            self._session = self._onnx_session(model)
+        self.model = model
+
+    def _onnx_session(self, model):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise RuntimeError("onnx backend requires 'onnxruntime' (pip install onnxruntime)") from e
+        onnx_path = self.model_dir / "model.onnx"
+        if not onnx_path.exists():
+            dummy = self.tokenizer(["export"], return_tensors="pt")
+            torch.onnx.export(
+                model,
+                (dummy["input_ids"], dummy["attention_mask"]),
+                str(onnx_path),
+                input_names=["input_ids", "attention_mask"],
+                output_names=["logits"],
+                dynamic_axes={
+                    "input_ids": {0: "batch", 1: "seq"},
+                    "attention_mask": {0: "batch", 1: "seq"},
+                    "logits": {0: "batch"},
+                },
+                opset_version=14,
+            )
+        return ort.InferenceSession(str(onnx_path), providers=["CPUExecutionProvider"])
+
+    def _logits(self, enc: Dict[str, torch.Tensor]) -> np.ndarray:
+        if self._session is not None:
+            feeds = {k: enc[k].numpy() for k in ("input_ids", "attention_mask")}
+            return self._session.run(["logits"], feeds)[0]
+        with torch.inference_mode():
+            return self.model(input_ids=enc["input_ids"], attention_mask=enc["attention_mask"]).logits.numpy()
+
+    def predict_proba(self, texts: Sequence[str], batch_size: int = 16) -> List[Dict[str, float]]:
+        """Per-label probabilities for each text (max over its windows)."""
+        scores = np.zeros((len(texts), len(self.labels)), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            chunk = [t or "" for t in texts[start:start + batch_size]]
+            enc = self.tokenizer(
+                chunk,
+                truncation=True,
+                max_length=self.max_length,
+                stride=self.stride,
+                return_overflowing_tokens=True,
+                padding=True,
+                return_tensors="pt",
+            )
+            owners = enc.pop("overflow_to_sample_mapping").numpy() + start
+            # windows of one batch can outnumber the texts; keep forward passes bounded
+            for w in range(0, len(owners), batch_size):
+                part = {k: v[w:w + batch_size] for k, v in enc.items()}
+                probs = 1.0 / (1.0 + np.exp(-self._logits(part)))
+                np.maximum.at(scores, owners[w:w + batch_size], probs)
+        return [dict(zip(self.labels, row.tolist())) for row in scores]
+
+    def predict(self, texts: Sequence[str], batch_size: int = 16) -> List[Set[str]]:
+        return [
+            {lbl for lbl, p in probs.items() if p >= self.thresholds.get(lbl, 0.5)}
+            for probs in self.predict_proba(texts, batch_size)
+        ]
+
+
+def _load_eval(path: Path, labels: List[str]):
+    # same loader as training, so JSONL and dataset_store .db files both work
+    from models.transcript_classifier import LABELS as TRAIN_LABELS, load_dataset
+
+    ds = load_dataset(path)
+    texts = list(ds["text"])
+    gold = [
+        {lbl for lbl, on in zip(TRAIN_LABELS, row) if on and lbl in labels}
+        for row in ds["labels"]
+    ]
+    return texts, gold
+
+
+def _micro_f1(pred: List[Set[str]], gold: List[Set[str]]) -> float:
+    tp = sum(len(p & g) for p, g in zip(pred, gold))
+    fp = sum(len(p - g) for p, g in zip(pred, gold))
+    fn = sum(len(g - p) for p, g in zip(pred, gold))
+    return 2 * tp / (2 * tp + fp + fn) if tp else 0.0
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Compare classifier backends on latency and accuracy")
+    p.add_argument("model", type=Path, help="Directory of the trained model")
+    p.add_argument("dataset", type=Path, help="Labeled JSONL or dataset_store .db to evaluate on")
+    p.add_argument("--backends", nargs="+", default=["fp32", "int8"], choices=BACKENDS)
+    p.add_argument("--batch-size", type=int, default=16)
+    args = p.parse_args()
+
+    reference: List[Set[str]] | None = None
+    print(f"{'backend':8} {'ms/clip':>8} {'micro_f1':>9} {'agree':>6}")
+    for backend in args.backends:
+        clf = TranscriptClassifier(args.model, backend=backend)
+        texts, gold = _load_eval(args.dataset, clf.labels)
+        clf.predict(texts[: args.batch_size], args.batch_size)  # warm-up
+        t0 = time.perf_counter()
+        pred = clf.predict(texts, args.batch_size)
+        ms = 1000 * (time.perf_counter() - t0) / max(1, len(texts))
+        reference = reference or pred
+        agree = sum(a == b for a, b in zip(pred, reference)) / max(1, len(pred))
+        print(f"{backend:8} {ms:8.1f} {_micro_f1(pred, gold):9.3f} {agree:6.3f}")
+
+
+if __name__ == "__main__":
+    main()
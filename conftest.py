@@ -0,0 +1 @@
+# Keeps the repo root importable for tests/ (modules live at the top level).
@@ -0,0 +1,243 @@
+"""Indexed store for labeled clips, replacing the append-only JSONL.
+
+Examples live in SQLite with indexes on video ID, flag and operator, so
+"all clips with offshore_brand" is an index lookup rather than a file scan.
+Inserts are deduplicated by a content hash of the transcript + OCR text (of
+the video ID/path for clips with no text at all, e.g. logo-only examples).
+`to_hf_dataset` exports the table to Parquet once per store revision and loads
+that through `datasets`, which caches it as Arrow and memory-maps it.
+
+One-shot migration and queries:
+
+    python dataset_store.py migrate dataset.jsonl dataset.db
+    python dataset_store.py query dataset.db --flag offshore_brand
+"""
+import argparse
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS examples (
+    id INTEGER PRIMARY KEY,
+    content_hash TEXT NOT NULL UNIQUE,
+    video TEXT,
+    video_id TEXT,
+    transcript TEXT NOT NULL DEFAULT '',
+    ocr_text TEXT NOT NULL DEFAULT '',
+    flags TEXT NOT NULL DEFAULT '{}',
+    operators TEXT NOT NULL DEFAULT '[]',
+    created REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_examples_video_id ON examples(video_id);
+CREATE INDEX IF NOT EXISTS idx_examples_video ON examples(video);
+CREATE TABLE IF NOT EXISTS example_flags (
+    example_id INTEGER NOT NULL REFERENCES examples(id) ON DELETE CASCADE,
+    flag TEXT NOT NULL,
+    PRIMARY KEY (flag, example_id)
+);
+CREATE TABLE IF NOT EXISTS example_operators (
+    example_id INTEGER NOT NULL REFERENCES examples(id) ON DELETE CASCADE,
+    operator TEXT NOT NULL,
+    PRIMARY KEY (operator, example_id)
+);
+"""
+
+EXPORT_COLUMNS = ("video", "video_id", "transcript", "ocr_text", "flags", "operators")
+
+
+def content_hash(entry: Dict[str, Any]) -> str:
+    # Text only, so a clip hashes the same whether or not its file is on disk
+    # (labeling vs. migrating a JSONL elsewhere).
+    text = " ".join(f"{entry.get('transcript') or ''}\n{entry.get('ocr_text') or ''}".lower().split())
+    if text:
+        return "text:" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+    # nothing said or shown: the labels are about the pictures, so keep one row per video
+    video = entry.get("video_id") or entry.get("video") or ""
+    return "video:" + hashlib.sha1(video.encode("utf-8")).hexdigest()
+
+
+class DatasetStore:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self) -> "DatasetStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def _insert(self, entry: Dict[str, Any]) -> bool:
+        flags = {k: bool(v) for k, v in (entry.get("flags") or {}).items()}
+        # stored lowercased; `query` lowercases its operator argument too
+        operators = sorted({op.lower() for op in entry.get("operators") or []})
+        video = entry.get("video")
+        cur = self.conn.execute(
+            "INSERT OR IGNORE INTO examples"
+            " (content_hash, video, video_id, transcript, ocr_text, flags, operators, created)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                entry.get("content_hash") or content_hash(entry),
+                video,
+                entry.get("video_id") or (Path(video).stem if video else None),
+                entry.get("transcript") or "",
+                entry.get("ocr_text") or "",
+                json.dumps(flags, sort_keys=True),
+                json.dumps(operators),
+                time.time(),
+            ),
+        )
+        if not cur.rowcount:
+            return False
+        rid = cur.lastrowid
+        self.conn.executemany(
+            "INSERT INTO example_flags (example_id, flag) VALUES (?, ?)",
+            [(rid, f) for f, on in flags.items() if on],
+        )
+        self.conn.executemany(
+            "INSERT INTO example_operators (example_id, operator) VALUES (?, ?)",
+            [(rid, op) for op in operators],
+        )
+        return True
+
+    def add(self, entry: Dict[str, Any]) -> bool:
+        """Insert one labeled example; returns False if its content is already stored."""
+        with self.conn:
+            return self._insert(entry)
+
+    def add_many(self, entries: Iterable[Dict[str, Any]]) -> int:
+        with self.conn:
+            return sum(self._insert(e) for e in entries)
+
+    def has_video(self, video: str) -> bool:
+        row = self.conn.execute("SELECT 1 FROM examples WHERE video = ? LIMIT 1", (video,)).fetchone()
+        return row is not None
+
+    def videos(self) -> List[str]:
+        return [r[0] for r in self.conn.execute("SELECT video FROM examples WHERE video IS NOT NULL")]
+
+    def query(self, flag: str | None = None, operator: str | None = None, video_id: str | None = None) -> Iterator[Dict[str, Any]]:
+        sql = "SELECT e.* FROM examples e"
+        where, params = [], []
+        if flag:
+            sql += " JOIN example_flags f ON f.example_id = e.id"
+            where.append("f.flag = ?")
+            params.append(flag)
+        if operator:
+            sql += " JOIN example_operators o ON o.example_id = e.id"
+            where.append("o.operator = ?")
+            params.append(operator.lower())
+        if video_id:
+            where.append("e.video_id = ?")
+            params.append(video_id)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        for row in self.conn.execute(sql + " ORDER BY e.id", params):
+            yield self._row(row)
+
+    @staticmethod
+    def _row(row: sqlite3.Row) -> Dict[str, Any]:
+        out = dict(row)
+        out["flags"] = json.loads(out["flags"])
+        out["operators"] = json.loads(out["operators"])
+        return out
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM examples").fetchone()[0]
+
+    def revision(self) -> str:
+        """Changes whenever an example is added (rows are never edited in place)."""
+        h = hashlib.sha1()
+        for rid, chash in self.conn.execute("SELECT id, content_hash FROM examples ORDER BY id"):
+            h.update(f"{rid}:{chash}\n".encode("utf-8"))
+        return h.hexdigest()[:16]
+
+    def export_parquet(self, batch: int = 10000) -> Path:
+        """Write the examples to ``.<stem>_export/<revision>.parquet`` unless already there."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        out_dir = self.path.parent / f".{self.path.stem}_export"
+        out = out_dir / f"{self.revision()}.parquet"
+        if out.exists():
+            return out
+        out_dir.mkdir(parents=True, exist_ok=True)
+        schema = pa.schema([(c, pa.string()) for c in EXPORT_COLUMNS])
+        tmp = out.with_suffix(".tmp")
+        cur = self.conn.execute(f"SELECT {', '.join(EXPORT_COLUMNS)} FROM examples ORDER BY id")
+        with pq.ParquetWriter(str(tmp), schema) as writer:
+            while True:
+                rows = cur.fetchmany(batch)
+                if not rows:
+                    break
+                writer.write_table(pa.Table.from_pylist([dict(r) for r in rows], schema=schema))
+        tmp.replace(out)
+        for old in out_dir.glob("*.parquet"):
+            if old != out:
+                old.unlink()
+        return out
+
+    def to_hf_dataset(self, cache_dir: str | None = None):
+        """Load into `datasets` (Arrow cache, memory-mapped). `flags` stays a JSON string.
+
+        Goes through a Parquet export of the current revision: `datasets`
+        fingerprints a file by path and mtime, so an unchanged store reuses
+        its Arrow cache (and any cache keyed on the dataset fingerprint).
+        """
+        from datasets import Dataset
+
+        return Dataset.from_parquet(str(self.export_parquet()), cache_dir=cache_dir)
+
+    def migrate_jsonl(self, jsonl: Path, batch: int = 1000) -> int:
+        """Import an existing labeled JSONL; duplicates are skipped."""
+        added = 0
+        buf: List[Dict[str, Any]] = []
+        with Path(jsonl).open(encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    buf.append(json.loads(line))
+                if len(buf) >= batch:
+                    added += self.add_many(buf)
+                    buf = []
+        return added + self.add_many(buf)
+
+
+def is_store_path(path: Path) -> bool:
+    return Path(path).suffix.lower() in (".db", ".sqlite", ".sqlite3")
+
+
+def main() -> None:
+    p = argparse.ArgumentParser(description="Labeled dataset store")
+    sub = p.add_subparsers(dest="cmd", required=True)
+    m = sub.add_parser("migrate", help="Import a JSONL dataset into a store")
+    m.add_argument("jsonl", type=Path)
+    m.add_argument("db", type=Path)
+    q = sub.add_parser("query", help="Print matching examples as JSON lines")
+    q.add_argument("db", type=Path)
+    q.add_argument("--flag")
+    q.add_argument("--operator")
+    q.add_argument("--video-id")
+    args = p.parse_args()
+
+    with DatasetStore(args.db) as store:
+        if args.cmd == "migrate":
+            added = store.migrate_jsonl(args.jsonl)
+            print(f"Imported {added} example(s); {len(store)} total in {args.db}")
+        else:
+            for row in store.query(args.flag, args.operator, args.video_id):
+                print(json.dumps(row))
+
+
+if __name__ == "__main__":
+    main()
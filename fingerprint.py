@@ -0,0 +1,248 @@
+"""Near-duplicate clip detection for re-uploads.
+
+A clip's fingerprint is the sequence of 64-bit perceptual hashes (DCT pHash)
+of the 1 fps frames `pipeline.extract_frames` already writes, plus a compact
+audio fingerprint: one 32-bit word per 100 ms from the sign of band-energy
+differences (Haitsma/Kalker style) over the 16 kHz WAV from `extract_audio`.
+Both survive re-encodes and small crops; a different intro only shortens the
+overlap.
+
+Lookup is LSH-style: each frame hash is split into four 16-bit bands and every
+audio word is a key of its own. Clips sharing keys with the query become
+candidates and only those are compared in full.
+"""
+import json
+import sqlite3
+import threading
+import wave
+from collections import Counter
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+
+FRAME_BANDS = 4
+FRAME_MAX_HAMMING = 14
+AUDIO_HOP_S = 0.1
+AUDIO_MIN_OVERLAP = 30  # audio words (= 3 s)
+
+
+@dataclass
+class Fingerprint:
+    frames: List[int] = field(default_factory=list)
+    audio: List[int] = field(default_factory=list)
+
+
+@dataclass
+class Match:
+    clip_id: int
+    key: str
+    frame_sim: float
+    audio_sim: float
+    result: Dict[str, Any]
+    # share of the longer clip explained by the match; a short clip inside a
+    # compilation scores high on *_sim but low here
+    frame_cov: float = 0.0
+    audio_cov: float = 0.0
+    # pipeline options the stored result was computed with
+    options: Dict[str, Any] = field(default_factory=dict)
+
+
+def phash(gray: np.ndarray) -> int:
+    small = cv2.resize(gray, (32, 32), interpolation=cv2.INTER_AREA).astype(np.float32)
+    low = cv2.dct(small)[:8, :8].flatten()
+    bits = low > np.median(low[1:])
+    return int("".join("1" if b else "0" for b in bits), 2)
+
+
+def frame_hashes(frame_paths: Sequence[str]) -> List[int]:
+    hashes = []
+    for fp in frame_paths:
+        gray = cv2.imread(fp, cv2.IMREAD_GRAYSCALE)
+        # flat frames (black intros, fades) hash to noise and match everything
+        if gray is None or gray.std() < 5:
+            continue
+        hashes.append(phash(gray))
+    return hashes
+
+
+def audio_fingerprint(wav_path: str, hop_s: float = AUDIO_HOP_S) -> List[int]:
+    with wave.open(wav_path, "rb") as w:
+        sr = w.getframerate()
+        raw = w.readframes(w.getnframes())
+        channels = w.getnchannels()
+    samples = np.frombuffer(raw, dtype=np.int16).astype(np.float32)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    win, hop = 2048, int(sr * hop_s)
+    if len(samples) < win + hop:
+        return []
+
+    n = 1 + (len(samples) - win) // hop
+    idx = np.arange(win)[None, :] + hop * np.arange(n)[:, None]
+    spec = np.abs(np.fft.rfft(samples[idx] * np.hanning(win), axis=1)) ** 2
+    freqs = np.fft.rfftfreq(win, 1.0 / sr)
+    edges = np.geomspace(300, 3000, 34)
+    bands = np.stack(
+        [spec[:, (freqs >= lo) & (freqs < hi)].sum(axis=1) for lo, hi in zip(edges[:-1], edges[1:])], axis=1
+    )
+    diff = bands[:, :-1] - bands[:, 1:]
+    bits = (diff[1:] - diff[:-1]) > 0
+    weights = (1 << np.arange(31, -1, -1, dtype=np.uint64))
+    return [int(v) for v in (bits.astype(np.uint64) * weights).sum(axis=1)]
+
+
+def fingerprint_clip(frame_paths: Sequence[str], wav_path: Optional[str]) -> Fingerprint:
+    audio = audio_fingerprint(wav_path) if wav_path else []
+    return Fingerprint(frames=frame_hashes(frame_paths), audio=audio)
+
+
+def _popcount(x: np.ndarray) -> np.ndarray:
+    return np.unpackbits(x.view(np.uint8).reshape(*x.shape, -1), axis=-1).sum(axis=-1)
+
+
+def frame_similarity(
+    query: Sequence[int], ref: Sequence[int], max_hamming: int = FRAME_MAX_HAMMING
+) -> Tuple[float, float]:
+    """``(similarity, coverage)`` of two frame-hash sequences.
+
+    Similarity is the share of the shorter clip's frames with a near match in
+    the other. Coverage is the smaller of the matched shares of ``query`` and
+    ``ref``, so it is only high when the match spans both clips.
+    """
+    if not query or not ref:
+        return 0.0, 0.0
+    xq = np.array(query, dtype=np.uint64)[:, None]
+    xr = np.array(ref, dtype=np.uint64)[None, :]
+    near = _popcount(xq ^ xr) <= max_hamming
+    q_cov = float(near.any(axis=1).mean())
+    r_cov = float(near.any(axis=0).mean())
+    sim = q_cov if len(query) <= len(ref) else r_cov
+    return sim, min(q_cov, r_cov)
+
+
+def audio_similarity(
+    query: Sequence[int], ref: Sequence[int], min_overlap: int = AUDIO_MIN_OVERLAP
+) -> Tuple[float, float]:
+    """``(1 - bit error rate, coverage)`` at the best alignment of ``query`` against ``ref``.
+
+    Alignments are proposed by words that occur exactly in both (as in
+    Haitsma/Kalker), so long clips are not compared at every offset. Coverage
+    is the aligned overlap over the longer of the two clips.
+    """
+    if len(query) < min_overlap or len(ref) < min_overlap:
+        return 0.0, 0.0
+    xa = np.array(query, dtype=np.uint32)
+    xb = np.array(ref, dtype=np.uint32)
+    pos_b: Dict[int, List[int]] = {}
+    for j, w in enumerate(ref):
+        pos_b.setdefault(w, []).append(j)
+    votes: Counter = Counter()
+    for i, w in enumerate(query):
+        for j in pos_b.get(w, ())[:8]:
+            votes[i - j] += 1
+    offsets = {o + d for o, _ in votes.most_common(5) for d in (-1, 0, 1)}
+
+    best, best_cov = 0.0, 0.0
+    for off in offsets:
+        sa = xa[max(0, off):]
+        sb = xb[max(0, -off):]
+        m = min(len(sa), len(sb))
+        if m < min_overlap:
+            continue
+        sim = 1.0 - _popcount(sa[:m] ^ sb[:m]).sum() / (32.0 * m)
+        if sim > best:
+            best, best_cov = sim, m / max(len(xa), len(xb))
+    return best, best_cov
+
+
+def _keys(fp: Fingerprint) -> List[str]:
+    keys = set()
+    for h in fp.frames:
+        for b in range(FRAME_BANDS):
+            keys.add(f"f{b}:{(h >> (16 * b)) & 0xFFFF:04x}")
+    keys.update(f"a:{w:08x}" for w in fp.audio)
+    return list(keys)
+
+
+class FingerprintIndex:
+    """SQLite-backed store of fingerprints and the results computed for them."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._lock = threading.Lock()
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS clips (
+                id INTEGER PRIMARY KEY,
+                key TEXT,
+                frames TEXT NOT NULL,
+                audio TEXT NOT NULL,
+                result TEXT NOT NULL,
+                options TEXT NOT NULL DEFAULT '{}'
+            );
+            CREATE TABLE IF NOT EXISTS lsh (
+                bucket TEXT NOT NULL,
+                clip_id INTEGER NOT NULL,
+                PRIMARY KEY (bucket, clip_id)
+            );
+            """
+        )
+        cols = {r[1] for r in self.conn.execute("PRAGMA table_info(clips)")}
+        if "options" not in cols:
+            # indexes created before options were recorded; their results never fully match
+            self.conn.execute("ALTER TABLE clips ADD COLUMN options TEXT NOT NULL DEFAULT '{}'")
+
+    def add(
+        self, fp: Fingerprint, result: Dict[str, Any], key: str | None = None, options: Dict[str, Any] | None = None
+    ) -> int:
+        with self._lock, self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO clips (key, frames, audio, result, options) VALUES (?, ?, ?, ?, ?)",
+                (
+                    key,
+                    json.dumps(fp.frames),
+                    json.dumps(fp.audio),
+                    json.dumps(result, default=list),
+                    json.dumps(options or {}, sort_keys=True),
+                ),
+            )
+            cid = cur.lastrowid
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO lsh (bucket, clip_id) VALUES (?, ?)", [(k, cid) for k in _keys(fp)]
+            )
+        return cid
+
+    def _candidates(self, fp: Fingerprint, limit: int) -> List[int]:
+        counts: Counter = Counter()
+        keys = _keys(fp)
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            sql = "SELECT clip_id FROM lsh WHERE bucket IN (%s)" % ",".join("?" * len(chunk))
+            counts.update(r[0] for r in self.conn.execute(sql, chunk))
+        # one shared bucket is chance; require corroboration
+        return [cid for cid, c in counts.most_common(limit) if c >= 2]
+
+    def lookup(self, fp: Fingerprint, limit: int = 10) -> Optional[Match]:
+        """Best prior clip by coverage-weighted frame/audio similarity, if any candidate exists."""
+        best: Optional[Match] = None
+        best_score = -1.0
+        with self._lock:
+            cands = self._candidates(fp, limit)
+            rows = [
+                self.conn.execute(
+                    "SELECT id, key, frames, audio, result, options FROM clips WHERE id = ?", (cid,)
+                ).fetchone()
+                for cid in cands
+            ]
+        for cid, key, frames, audio, result, options in filter(None, rows):
+            fs, fc = frame_similarity(fp.frames, json.loads(frames))
+            aus, ac = audio_similarity(fp.audio, json.loads(audio))
+            score = fs * fc + aus * ac
+            if score > best_score:
+                best_score = score
+                best = Match(cid, key, fs, aus, json.loads(result), fc, ac, json.loads(options or "{}"))
+        return best
@@ -6,6 +6,8 @@ from rapidfuzz import fuzz, process
 from sentence_transformers import SentenceTransformer, util
 import torch
 
+from model_registry import REGISTRY
+
 
 # Regex patterns for transcript/OCR hits
 PATTERNS = {
@@ -69,7 +71,7 @@ def fuzzy_hits(text: str, threshold: int = 85) -> Set[str]:
 
 
 # Embedding-based phrase matcher to capture semantic paraphrases
-EMBED_MODEL: SentenceTransformer | None = None
+# (MiniLM is loaded on demand through the model registry)
 PHRASE_EMBEDS: Dict[str, 'torch.Tensor'] = {}
 EMBED_PHRASES = {
     "chasing_losses": [
@@ -88,21 +90,18 @@ EMBED_PHRASES = {
 }
 
 
-def _get_embed_model() -> SentenceTransformer:
-    global EMBED_MODEL
-    if EMBED_MODEL is None:
-        EMBED_MODEL = SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2")
-    return EMBED_MODEL
+REGISTRY.register("minilm", lambda: SentenceTransformer("sentence-transformers/all-MiniLM-L6-v2"))
 
 
 def embedding_hits(text: str, threshold: float = 0.7) -> Set[str]:
     """Return labels whose phrases are semantically similar to ``text``."""
-    model = _get_embed_model()
-    text_emb = model.encode(text, convert_to_tensor=True)
+    with REGISTRY.use("minilm") as model:
+        text_emb = model.encode(text, convert_to_tensor=True)
+        for label, phrases in EMBED_PHRASES.items():
+            if label not in PHRASE_EMBEDS:
+                PHRASE_EMBEDS[label] = model.encode(phrases, convert_to_tensor=True)
     fired: Set[str] = set()
-    for label, phrases in EMBED_PHRASES.items():
-        if label not in PHRASE_EMBEDS:
-            PHRASE_EMBEDS[label] = model.encode(phrases, convert_to_tensor=True)
+    for label in EMBED_PHRASES:
         sims = util.cos_sim(text_emb, PHRASE_EMBEDS[label])
         if float(sims.max()) >= threshold:
             fired.add(label)
@@ -0,0 +1,286 @@
+"""Shared YouTube ingest used by `pipeline.py` and `download_clip.py`.
+
+Downloads are cached on disk by video ID, so re-running a sweep over the same
+URLs never re-fetches bytes. `fetch_metadata` pulls title/description/duration/
+hashtags without downloading anything, which lets cheap rules triage a clip
+first, and `download(..., audio_only=True)` is the fast path for
+transcript-first triage. `download_many` runs a thread pool with per-host
+rate limiting for batch sweeps.
+
+The `ydl_factory` argument accepted throughout defaults to `yt_dlp.YoutubeDL`;
+pass any object with the same `extract_info`/`prepare_filename` surface to run
+against a local stand-in instead of live YouTube.
+"""
+import glob
+import json
+import os
+import re
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Optional
+from urllib.parse import parse_qs, urlparse
+
+from yt_dlp import YoutubeDL
+
+CACHE_DIR = Path(
+    os.environ.get("RG_INGEST_CACHE", Path(__file__).resolve().parent / "artifacts" / "ingest_cache")
+)
+
+# Prefer mp4+avc+aac (18) with fallbacks that avoid SABR-only streams
+VIDEO_FORMAT = "18/(bv*[vcodec^=avc1]/b)[height<=720]+(ba[acodec^=mp4a]/b)/b"
+AUDIO_FORMAT = "bestaudio[ext=m4a]/bestaudio/best"
+
+# Minimum seconds between requests to the same host (shared by all workers)
+DEFAULT_HOST_INTERVAL = float(os.environ.get("RG_INGEST_HOST_INTERVAL", "1.0"))
+
+_ID_RE = re.compile(r"^[A-Za-z0-9_-]{6,}$")
+
+
+def normalize_youtube_url(url: str) -> str:
+    # Convert Shorts / youtu.be → watch?v= format (more reliable)
+    vid = video_id(url)
+    if vid and ("/shorts/" in url or "youtu.be/" in url):
+        return f"https://www.youtube.com/watch?v={vid}"
+    return url
+
+
+def video_id(url: str) -> Optional[str]:
+    """Best-effort video ID from the URL alone (no network)."""
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    parts = [p for p in parsed.path.split("/") if p]
+    cand = None
+    if host.endswith("youtu.be") and parts:
+        cand = parts[0]
+    elif "youtube" in host:
+        if parts[:1] in (["shorts"], ["embed"], ["live"]) and len(parts) > 1:
+            cand = parts[1]
+        else:
+            cand = (parse_qs(parsed.query).get("v") or [None])[0]
+    if cand and _ID_RE.match(cand):
+        return cand
+    return None
+
+
+def build_ydl_opts(
+    outdir: Path,
+    cookies: Optional[str] = None,
+    audio_only: bool = False,
+    quiet: bool = True,
+) -> dict:
+    opts = {
+        "outtmpl": str(Path(outdir) / ("%(id)s.audio.%(ext)s" if audio_only else "%(id)s.%(ext)s")),
+        "format": AUDIO_FORMAT if audio_only else VIDEO_FORMAT,
+        "noplaylist": True,
+        "quiet": quiet,
+        "no_warnings": quiet,
+        # try multiple player clients to dodge signature issues / SABR
+        "extractor_args": {"youtube": {"player_client": ["web", "ios", "android"]}},
+        "http_headers": {"User-Agent": "Mozilla/5.0"},
+    }
+
+    # Auth/cookies precedence: explicit cookies > env YTDLP_COOKIES > env YTDLP_BROWSER
+    if cookies:
+        opts["cookiefile"] = cookies
+    else:
+        env_cookie = os.environ.get("YTDLP_COOKIES")
+        if env_cookie and os.path.exists(env_cookie):
+            opts["cookiefile"] = env_cookie
+        else:
+            browser = os.environ.get("YTDLP_BROWSER")
+            if browser:
+                opts["cookiesfrombrowser"] = (browser,)
+    return opts
+
+
+def ensure_mp4(path: str) -> str:
+    if path.lower().endswith(".mp4"):
+        return path
+    mp4_path = os.path.splitext(path)[0] + ".mp4"
+    # remux container without re-encoding
+    subprocess.run(["ffmpeg", "-y", "-i", path, "-c", "copy", mp4_path], check=True)
+    return mp4_path
+
+
+class HostRateLimiter:
+    """Spaces out requests per host; safe to share across threads."""
+
+    def __init__(self, min_interval: float = DEFAULT_HOST_INTERVAL) -> None:
+        self.min_interval = min_interval
+        self._next: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str) -> None:
+        if self.min_interval <= 0:
+            return
+        host = (urlparse(url).hostname or "").lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, 0.0))
+            self._next[host] = slot + self.min_interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_LIMITER = HostRateLimiter()
+_TLS = threading.local()
+
+
+def _get_ydl(opts: dict, ydl_factory: Callable[[dict], Any]):
+    # One YoutubeDL per thread and option set; building one is not free
+    # (extractor registry, cookie jar) and instances are not thread-safe.
+    cache = getattr(_TLS, "ydls", None)
+    if cache is None:
+        cache = _TLS.ydls = {}
+    key = (id(ydl_factory), json.dumps(opts, sort_keys=True, default=str))
+    ydl = cache.get(key)
+    if ydl is None:
+        ydl = cache[key] = ydl_factory(opts)
+    return ydl
+
+
+def _cached_media(cache_dir: Path, vid: str, audio_only: bool) -> Optional[str]:
+    if audio_only:
+        pattern = str(cache_dir / f"{glob.escape(vid)}.audio.*")
+    else:
+        pattern = str(cache_dir / f"{glob.escape(vid)}.mp4")
+    for path in sorted(glob.glob(pattern)):
+        if not path.endswith((".part", ".ytdl", ".json")):
+            return path
+    return None
+
+
+def _slim_metadata(info: Dict[str, Any]) -> Dict[str, Any]:
+    title = info.get("title") or ""
+    description = info.get("description") or ""
+    tags = [t for t in (info.get("tags") or []) if t]
+    hashtags = sorted({h.lower() for h in re.findall(r"#(\w+)", f"{title}\n{description}")})
+    return {
+        "id": info.get("id"),
+        "title": title,
+        "description": description,
+        "duration": info.get("duration"),
+        "hashtags": hashtags,
+        "tags": tags,
+        "channel": info.get("channel") or info.get("uploader"),
+        "webpage_url": info.get("webpage_url"),
+    }
+
+
+def metadata_text(meta: Dict[str, Any]) -> str:
+    """Flatten metadata into text for the same rules used on transcripts."""
+    tags = " ".join(f"#{h}" for h in meta.get("hashtags", []))
+    return "\n".join(filter(None, [meta.get("title"), meta.get("description"), tags]))
+
+
+def fetch_metadata(
+    url: str,
+    cache_dir: Path = CACHE_DIR,
+    cookies: Optional[str] = None,
+    limiter: Optional[HostRateLimiter] = None,
+    ydl_factory: Callable[[dict], Any] = YoutubeDL,
+) -> Dict[str, Any]:
+    """Title, description, duration and hashtags without fetching media."""
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    url = normalize_youtube_url(url)
+    vid = video_id(url)
+    if vid:
+        meta_path = cache_dir / f"{vid}.info.json"
+        if meta_path.exists():
+            return json.loads(meta_path.read_text())
+
+    (limiter or _LIMITER).wait(url)
+    ydl = _get_ydl(build_ydl_opts(cache_dir, cookies), ydl_factory)
+    meta = _slim_metadata(ydl.extract_info(url, download=False))
+    if meta.get("id"):
+        (cache_dir / f"{meta['id']}.info.json").write_text(json.dumps(meta))
+    return meta
+
+
+def download(
+    url: str,
+    cache_dir: Path = CACHE_DIR,
+    audio_only: bool = False,
+    cookies: Optional[str] = None,
+    limiter: Optional[HostRateLimiter] = None,
+    ydl_factory: Callable[[dict], Any] = YoutubeDL,
+) -> str:
+    """Download (or reuse from cache) a video as mp4, or its audio track."""
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    url = normalize_youtube_url(url)
+    vid = video_id(url)
+    if vid:
+        hit = _cached_media(cache_dir, vid, audio_only)
+        if hit:
+            return hit
+
+    (limiter or _LIMITER).wait(url)
+    ydl = _get_ydl(build_ydl_opts(cache_dir, cookies, audio_only=audio_only), ydl_factory)
+    info = ydl.extract_info(url, download=True)
+    if info.get("id"):
+        # metadata comes for free with the download; keep it for triage
+        meta_path = cache_dir / f"{info['id']}.info.json"
+        if not meta_path.exists():
+            meta_path.write_text(json.dumps(_slim_metadata(info)))
+    path = ydl.prepare_filename(info)
+    return path if audio_only else ensure_mp4(path)
+
+
+def dedup_key(url: str) -> str:
+    """Video ID when it can be read from the URL, so Shorts/watch/youtu.be links collapse."""
+    return video_id(normalize_youtube_url(url)) or url
+
+
+def _run_pool(urls: Iterable[str], fn: Callable[[str], Any], workers: int) -> Dict[str, Any]:
+    # one job per video: two URL forms of the same video would otherwise race
+    # on the same output file
+    urls = list(dict.fromkeys(urls))
+    first: Dict[str, str] = {}
+    for u in urls:
+        first.setdefault(dedup_key(u), u)
+
+    def one(u: str):
+        try:
+            return fn(u)
+        except Exception as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        done = dict(zip(first.values(), pool.map(one, first.values())))
+    return {u: done[first[dedup_key(u)]] for u in urls}
+
+
+def download_many(
+    urls: Iterable[str],
+    cache_dir: Path = CACHE_DIR,
+    audio_only: bool = False,
+    cookies: Optional[str] = None,
+    workers: int = 4,
+    limiter: Optional[HostRateLimiter] = None,
+    ydl_factory: Callable[[dict], Any] = YoutubeDL,
+) -> Dict[str, Any]:
+    """Download ``urls`` concurrently.
+
+    Returns a mapping of url -> local path, or url -> Exception for failures,
+    so one bad link does not sink a whole sweep.
+    """
+    limiter = limiter or _LIMITER
+    return _run_pool(urls, lambda u: download(u, cache_dir, audio_only, cookies, limiter, ydl_factory), workers)
+
+
+def fetch_metadata_many(
+    urls: Iterable[str],
+    cache_dir: Path = CACHE_DIR,
+    cookies: Optional[str] = None,
+    workers: int = 4,
+    limiter: Optional[HostRateLimiter] = None,
+    ydl_factory: Callable[[dict], Any] = YoutubeDL,
+) -> Dict[str, Any]:
+    """Metadata-only pass over ``urls``; same result shape as `download_many`."""
+    limiter = limiter or _LIMITER
+    return _run_pool(urls, lambda u: fetch_metadata(u, cache_dir, cookies, limiter, ydl_factory), workers)
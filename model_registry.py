@@ -0,0 +1,262 @@
+"""Load-on-demand model registry with a RAM budget and idle unloading.
+
+Whisper, CLIP and MiniLM used to sit in module globals for the life of the
+process. Here each is registered with a loader and only loaded when first
+used; least-recently-used models are dropped to stay under the budget, when
+the host runs low on memory, or after sitting idle.
+
+Multi-process deployments should call `preload_for_fork(...)` in the parent
+before forking workers: the weights are loaded once, frozen out of the
+garbage collector and pinned, so children share the pages copy-on-write
+instead of each loading a copy.
+
+Settings (env): RG_MODEL_BUDGET_MB (0 = unlimited), RG_MODEL_IDLE_S
+(0 = never unload idle models), RG_MIN_FREE_MB (evict when the host has less
+available memory than this), RG_MODEL_MIN_RESIDENT_S (a model used this
+recently is not evicted for host memory pressure, default 60).
+"""
+import gc
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def _rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _available_bytes() -> Optional[int]:
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def model_bytes(obj: Any, _seen: Optional[set] = None) -> int:
+    """Bytes held by torch parameters/buffers reachable from ``obj``."""
+    try:
+        import torch
+    except ImportError:
+        return 0
+    seen = _seen if _seen is not None else set()
+    if obj is None or id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    if isinstance(obj, torch.nn.Module):
+        tensors = list(obj.parameters()) + list(obj.buffers())
+        return sum(t.numel() * t.element_size() for t in tensors)
+    if isinstance(obj, torch.Tensor):
+        return obj.numel() * obj.element_size()
+    if isinstance(obj, dict):
+        return sum(model_bytes(v, seen) for v in obj.values())
+    if hasattr(obj, "__dict__"):
+        return sum(model_bytes(v, seen) for v in vars(obj).values())
+    return 0
+
+
+@dataclass
+class _Entry:
+    loader: Callable[[], Any]
+    obj: Any = None
+    loaded: bool = False
+    size: int = 0
+    # size when last loaded; kept after unloading so a reload can make room first
+    last_size: int = 0
+    last_used: float = 0.0
+    pins: int = 0
+    shared: bool = False
+
+
+class ModelRegistry:
+    def __init__(
+        self, budget_mb: float = 0, idle_s: float = 0, min_free_mb: float = 0, min_resident_s: float = 60
+    ) -> None:
+        self.budget = int(budget_mb * 2**20)
+        self.idle_s = idle_s
+        self.min_free = int(min_free_mb * 2**20)
+        self.min_resident_s = min_resident_s
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.RLock()
+        self._reaper: Optional[threading.Thread] = None
+        if hasattr(os, "register_at_fork"):
+            # threads do not survive fork; let the child start its own reaper
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def _reset_after_fork(self) -> None:
+        self._lock = threading.RLock()
+        self._reaper = None
+
+    @classmethod
+    def from_env(cls) -> "ModelRegistry":
+        return cls(
+            budget_mb=float(os.environ.get("RG_MODEL_BUDGET_MB", "0")),
+            idle_s=float(os.environ.get("RG_MODEL_IDLE_S", "0")),
+            min_free_mb=float(os.environ.get("RG_MIN_FREE_MB", "0")),
+            min_resident_s=float(os.environ.get("RG_MODEL_MIN_RESIDENT_S", "60")),
+        )
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        with self._lock:
+            self._entries.setdefault(name, _Entry(loader))
+
+    def get(self, name: str) -> Any:
+        """The loaded model, loading it (and evicting others) if needed."""
+        with self._lock:
+            entry = self._entries[name]
+            if not entry.loaded:
+                self._load(name, entry)
+            entry.last_used = time.monotonic()
+            return entry.obj
+
+    def use(self, name: str) -> "_Pinned":
+        """``with registry.use(name) as model:`` keeps it from being evicted meanwhile."""
+        return _Pinned(self, name)
+
+    def _load(self, name: str, entry: _Entry) -> None:
+        # evict before loading, or old and new weights briefly coexist over the budget
+        self._enforce(keep=name, incoming=entry.last_size)
+        before = _rss_bytes()
+        entry.obj = entry.loader()
+        entry.loaded = True
+        # RSS delta also catches memory outside torch tensors (tokenizers, onnx sessions)
+        entry.size = entry.last_size = max(model_bytes(entry.obj), _rss_bytes() - before)
+        entry.last_used = time.monotonic()
+        self._enforce(keep=name)
+        self._start_reaper()
+
+    def unload(self, name: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(name)
+            if not entry or not entry.loaded or entry.pins or entry.shared:
+                return False
+            entry.obj = None
+            entry.loaded = False
+            entry.size = 0
+        gc.collect()
+        try:
+            import torch
+
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+        return True
+
+    def resident_bytes(self) -> int:
+        with self._lock:
+            return sum(e.size for e in self._entries.values() if e.loaded)
+
+    def _over_budget(self, incoming: int = 0) -> bool:
+        return bool(self.budget) and self.resident_bytes() + incoming > self.budget
+
+    def _host_low(self, incoming: int = 0) -> bool:
+        if not self.min_free:
+            return False
+        avail = _available_bytes()
+        return avail is not None and avail - incoming < self.min_free
+
+    def _enforce(self, keep: Optional[str] = None, incoming: int = 0) -> None:
+        # evict least recently used until under budget / out of pressure,
+        # leaving room for ``incoming`` bytes about to be loaded
+        while True:
+            over_budget = self._over_budget(incoming)
+            if not over_budget and not self._host_low(incoming):
+                return
+            now = time.monotonic()
+            with self._lock:
+                victims = sorted(
+                    (e.last_used, n)
+                    for n, e in self._entries.items()
+                    if e.loaded and not e.pins and not e.shared and n != keep
+                    # freed pages often stay with the process, so MemAvailable
+                    # may not recover; don't thrash recently used models over it
+                    and (over_budget or now - e.last_used >= self.min_resident_s)
+                )
+            if not victims or not self.unload(victims[0][1]):
+                return
+
+    def reap(self) -> None:
+        """Unload idle models and relieve memory pressure; run periodically."""
+        now = time.monotonic()
+        if self.idle_s:
+            with self._lock:
+                idle = [n for n, e in self._entries.items() if e.loaded and now - e.last_used >= self.idle_s]
+            for name in idle:
+                self.unload(name)
+        self._enforce()
+
+    def _start_reaper(self) -> None:
+        if self._reaper is not None or not (self.idle_s or self.min_free):
+            return
+        interval = max(1.0, min(self.idle_s or 30.0, 30.0) / 2)
+
+        def loop() -> None:
+            while True:
+                time.sleep(interval)
+                self.reap()
+
+        self._reaper = threading.Thread(target=loop, name="model-reaper", daemon=True)
+        self._reaper.start()
+
+    def preload_for_fork(self, names: Iterable[str]) -> None:
+        """Load ``names`` in the parent and share them with forked children.
+
+        Preloaded models are pinned: unloading them in a child would free
+        nothing (the pages belong to the parent) and reloading would make a
+        private copy.
+        """
+        for name in names:
+            self.get(name)
+            with self._lock:
+                self._entries[name].shared = True
+        gc.collect()
+        # keep GC bookkeeping writes from touching (and copying) shared pages
+        gc.freeze()
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """Per-model residency: loaded, resident MB, seconds since last use, shared."""
+        now = time.monotonic()
+        with self._lock:
+            return {
+                name: {
+                    "loaded": e.loaded,
+                    "resident_mb": round(e.size / 2**20, 1),
+                    "idle_s": round(now - e.last_used, 1) if e.loaded else None,
+                    "shared": e.shared,
+                }
+                for name, e in self._entries.items()
+            }
+
+
+class _Pinned:
+    def __init__(self, registry: ModelRegistry, name: str) -> None:
+        self.registry = registry
+        self.name = name
+
+    def __enter__(self) -> Any:
+        with self.registry._lock:
+            obj = self.registry.get(self.name)
+            self.registry._entries[self.name].pins += 1
+        return obj
+
+    def __exit__(self, *exc) -> None:
+        with self.registry._lock:
+            entry = self.registry._entries[self.name]
+            entry.pins -= 1
+            entry.last_used = time.monotonic()
+        # a pinned model may have held the registry over budget; the one just
+        # released is the most likely to be needed next, so it stays
+        self.registry._enforce(keep=self.name)
+
+
+REGISTRY = ModelRegistry.from_env()
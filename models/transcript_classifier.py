@@ -3,20 +3,32 @@
 This script expects a JSONL dataset where each row has `text` fields and a
 `flags` mapping of label -> bool. See `scripts/label_dataset.py` for
 producing labeled examples.
+
+Inputs are padded per batch (not to a fixed length) and batches are grouped by
+length, so short Shorts transcripts no longer pay for 256 tokens of padding.
+Tokenization runs batched across processes and is cached next to the dataset's
+Arrow cache, so re-runs on the same data skip it. Pass `--streaming` for JSONL
+files too large to convert up front.
 """
 import argparse
+import hashlib
 import json
+import os
 from pathlib import Path
 from typing import Dict, List
 
-from datasets import Dataset
+from datasets import IterableDataset
+from datasets import load_dataset as hf_load_dataset
 from transformers import (
     AutoTokenizer,
     AutoModelForSequenceClassification,
+    DataCollatorWithPadding,
     Trainer,
     TrainingArguments,
 )
 
+from dataset_store import DatasetStore, is_store_path
+
 LABELS = [
     "missing_disclaimer",
     "offshore_reference",
@@ -26,53 +38,138 @@ LABELS = [
     "vpn_proxy",
 ]
 
+MODEL_NAME = "distilbert-base-uncased"
+
+
+def _to_records(batch: Dict[str, List[object]]) -> Dict[str, List[object]]:
+    n = len(batch["flags"])
+    transcripts = batch.get("transcript") or [None] * n
+    ocr = batch.get("ocr_text") or [None] * n
+    out: Dict[str, List[object]] = {
+        "text": ["{}\n{}".format(t or "", o or "") for t, o in zip(transcripts, ocr)],
+        "labels": [],
+    }
+    for flags in batch["flags"]:
+        # the dataset store keeps flags as a JSON string
+        flags = json.loads(flags) if isinstance(flags, str) else (flags or {})
+        out["labels"].append([float(bool(flags.get(lbl))) for lbl in LABELS])
+    return out
+
+
+def load_dataset(path: Path, streaming: bool = False, cache_dir: str | None = None):
+    """Load the labeled JSONL (or `dataset_store.py` database) as `text` + float multi-hot `labels`.
+
+    The non-streaming path is backed by a memory-mapped Arrow cache rather
+    than a Python list, so large files are parsed once.
+    """
+    if is_store_path(path):
+        with DatasetStore(path) as store:
+            ds = store.to_hf_dataset(cache_dir=cache_dir)
+        if streaming:
+            ds = ds.to_iterable_dataset()
+    else:
+        ds = hf_load_dataset("json", data_files=str(path), split="train", streaming=streaming, cache_dir=cache_dir)
+    if ds.column_names is not None and "flags" not in ds.column_names:
+        raise ValueError(f"{path} has no 'flags' column")
+    return ds.map(_to_records, batched=True).select_columns(["text", "labels"])
+
+
+def tokenize(ds, tokenizer, max_length: int = 256, num_proc: int | None = None, cache_dir: Path | None = None):
+    def preprocess(batch: Dict[str, List[str]]) -> Dict[str, object]:
+        # No padding here: DataCollatorWithPadding pads each batch to its longest row
+        return tokenizer(batch["text"], truncation=True, max_length=max_length)
 
-def load_dataset(path: Path) -> Dataset:
-    records: List[Dict[str, object]] = []
-    with path.open() as f:
-        for line in f:
-            row = json.loads(line)
-            text = "{}\n{}".format(row.get("transcript", ""), row.get("ocr_text", ""))
-            flags = row.get("flags", {})
-            record = {"text": text}
-            for lbl in LABELS:
-                record[lbl] = int(bool(flags.get(lbl)))
-            records.append(record)
-    return Dataset.from_list(records)
+    if isinstance(ds, IterableDataset):
+        return ds.map(preprocess, batched=True, remove_columns=["text"])
+
+    cache_file = None
+    if cache_dir is not None:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        key = hashlib.sha1(f"{ds._fingerprint}:{tokenizer.name_or_path}:{max_length}".encode()).hexdigest()[:16]
+        cache_file = str(cache_dir / f"tokenized_{key}.arrow")
+    tokenized = ds.map(
+        preprocess,
+        batched=True,
+        batch_size=1000,
+        num_proc=num_proc if num_proc and num_proc > 1 and len(ds) >= 1000 else None,
+        remove_columns=["text"],
+        cache_file_name=cache_file,
+        load_from_cache_file=True,
+        desc="Tokenizing",
+    )
+    # Used by group_by_length; avoids a second pass over the data in Trainer
+    return tokenized.map(lambda b: {"length": [len(x) for x in b["input_ids"]]}, batched=True)
+
+
+def _count_lines(path: Path) -> int:
+    if is_store_path(path):
+        with DatasetStore(path) as store:
+            return len(store)
+    with path.open("rb") as f:
+        return sum(1 for line in f if line.strip())
 
 
 def main() -> None:
     p = argparse.ArgumentParser(description="Fine-tune a multi-label classifier")
-    p.add_argument("dataset", type=Path, help="Path to labeled JSONL dataset")
+    p.add_argument("dataset", type=Path, help="Path to labeled JSONL dataset or dataset_store .db")
     p.add_argument("output", type=Path, help="Directory to store the trained model")
     p.add_argument("--epochs", type=int, default=1)
+    p.add_argument("--batch-size", type=int, default=8)
+    p.add_argument("--max-length", type=int, default=256)
+    p.add_argument("--num-proc", type=int, default=os.cpu_count() or 1, help="Tokenization processes")
+    p.add_argument("--streaming", action="store_true", help="Stream the JSONL instead of converting it to Arrow first")
+    p.add_argument("--cache-dir", type=Path, default=None, help="Tokenization cache (default: <output>/.cache)")
     args = p.parse_args()
 
-    ds = load_dataset(args.dataset)
-    tokenizer = AutoTokenizer.from_pretrained("distilbert-base-uncased")
-
-    def preprocess(batch: Dict[str, str]) -> Dict[str, object]:
-        tokens = tokenizer(batch["text"], truncation=True, padding="max_length", max_length=256)
-        tokens["labels"] = [batch[lbl] for lbl in LABELS]
-        return tokens
-
-    tokenized = ds.map(preprocess)
+    cache_dir = args.cache_dir or args.output / ".cache"
+    ds = load_dataset(args.dataset, streaming=args.streaming, cache_dir=str(cache_dir / "datasets"))
+    tokenizer = AutoTokenizer.from_pretrained(MODEL_NAME)
+    tokenized = tokenize(ds, tokenizer, args.max_length, args.num_proc, cache_dir)
 
     model = AutoModelForSequenceClassification.from_pretrained(
-        "distilbert-base-uncased", num_labels=len(LABELS), problem_type="multi_label_classification"
+        MODEL_NAME,
+        num_labels=len(LABELS),
+        problem_type="multi_label_classification",
+        # saved into config.json so classifier.py can map outputs back to flags
+        id2label=dict(enumerate(LABELS)),
+        label2id={lbl: i for i, lbl in enumerate(LABELS)},
     )
 
+    extra: Dict[str, object] = {}
+    if args.streaming:
+        # IterableDataset has no len(); Trainer needs an explicit step budget
+        steps_per_epoch = max(1, _count_lines(args.dataset) // args.batch_size)
+        extra["max_steps"] = steps_per_epoch * args.epochs
+    else:
+        extra["group_by_length"] = True
+        extra["length_column_name"] = "length"
+
     args_train = TrainingArguments(
         output_dir=str(args.output),
         num_train_epochs=args.epochs,
-        per_device_train_batch_size=8,
+        per_device_train_batch_size=args.batch_size,
         logging_steps=10,
         save_strategy="epoch",
+        dataloader_num_workers=min(4, args.num_proc),
+        **extra,
     )
 
-    trainer = Trainer(model=model, args=args_train, train_dataset=tokenized, tokenizer=tokenizer)
-    trainer.train()
+    trainer = Trainer(
+        model=model,
+        args=args_train,
+        train_dataset=tokenized,
+        tokenizer=tokenizer,
+        data_collator=DataCollatorWithPadding(tokenizer),
+    )
+    metrics = trainer.train().metrics
     trainer.save_model(str(args.output))
+    print(
+        "train: {:.1f} samples/sec, {:.2f} steps/sec, {:.0f}s total".format(
+            metrics.get("train_samples_per_second", 0.0),
+            metrics.get("train_steps_per_second", 0.0),
+            metrics.get("train_runtime", 0.0),
+        )
+    )
 
 
 if __name__ == "__main__":
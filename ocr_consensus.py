@@ -0,0 +1,124 @@
+"""Merge OCR reads of the same caption into one consensus line.
+
+`pipeline._ocr_reads` runs tesseract over several pre-processing variants and
+crops of every sampled frame, so one on-screen caption comes back as many
+slightly different reads. `consolidate_ocr` clusters them and emits one line
+per caption without dropping words that only some reads picked up.
+
+Reads are never merged when their digit-bearing tokens differ ("STAKE20" vs
+"STAKE50"), after folding the letters tesseract confuses with digits, so a
+"c0de"/"code" misread still joins its caption.
+"""
+from collections import Counter
+from difflib import SequenceMatcher
+from typing import Any, Dict, List, Set, Tuple
+
+import regex as re
+from rapidfuzz import fuzz as rf_fuzz, process as rf_process
+
+# letters tesseract reads for digits and back
+_CONFUSABLES = str.maketrans("oilsb", "01158")
+
+
+def ocr_key(text: str) -> str:
+    # trailing sentence punctuation dropped per word ("only." == "only"); inner dots kept (stake.com)
+    words = re.sub(r"[^\w#+.@]+", " ", text.lower()).split()
+    return " ".join(filter(None, (w.rstrip(".") for w in words)))
+
+
+def _fold(key: str) -> str:
+    return key.translate(_CONFUSABLES)
+
+
+def _numbers(key: str) -> Set[str]:
+    return {_fold(w) for w in key.split() if any(ch.isdigit() for ch in w)}
+
+
+def _same_numbers(a: str, b: str) -> bool:
+    # every digit-bearing token of each read also occurs (folded) in the other
+    return _numbers(a) <= set(_fold(b).split()) and _numbers(b) <= set(_fold(a).split())
+
+
+def _merge_variants(cluster: Dict[str, Any]) -> str:
+    # start from the medoid and splice in words only other reads picked up
+    base = cluster["raw"][cluster["key"]].split()
+    for key, _ in cluster["variants"].most_common():
+        if key == cluster["key"]:
+            continue
+        other = cluster["raw"][key].split()
+        sm = SequenceMatcher(
+            None, [_fold(ocr_key(t)) for t in base], [_fold(ocr_key(t)) for t in other], autojunk=False
+        )
+        for tag, i1, _, j1, j2 in reversed(sm.get_opcodes()):
+            if tag == "insert":
+                base[i1:i1] = [t for t in other[j1:j2] if ocr_key(t)]
+    return " ".join(base)
+
+
+def consolidate_ocr(reads: List[Tuple[int, str, float]], threshold: int = 85) -> List[Dict[str, Any]]:
+    """Collapse OCR reads of the same caption into one consensus line.
+
+    ``reads`` are ``(frame_index, text, confidence)`` from every variant of
+    every sampled frame. Reads whose normalized text is within ``threshold``
+    (rapidfuzz ratio) of a cluster join it, provided their digit-bearing
+    tokens agree. The cluster emits its medoid read plus any words that only
+    some reads have (``#ad``, ``vpn``), and a caption fully contained in a
+    longer one is folded into it, so no words are lost.
+
+    Returns ``{"text", "confidence", "support", "frames"}`` dicts in order of
+    first appearance.
+    """
+    clusters: List[Dict[str, Any]] = []
+    keys: List[str] = []  # representative key per cluster, for extract
+    exact: Dict[str, int] = {}
+    for order, (frame, text, conf) in enumerate(reads):
+        key = ocr_key(text)
+        if not key:
+            continue
+        ci = exact.get(key)
+        if ci is None:
+            cands = rf_process.extract(key, keys, scorer=rf_fuzz.ratio, score_cutoff=threshold, limit=None)
+            ci = next((idx for k, _, idx in cands if _same_numbers(key, k)), None)
+            if ci is None:
+                ci = len(clusters)
+                clusters.append({"variants": Counter(), "raw": {}, "confs": [], "frames": set(), "order": order})
+                keys.append(key)
+            exact[key] = ci
+        c = clusters[ci]
+        c["variants"][key] += 1
+        c["raw"].setdefault(key, text)
+        c["confs"].append(conf)
+        c["frames"].add(frame)
+
+    for c in clusters:
+        variants = c["variants"]
+        # medoid: the variant closest to all other reads of this caption
+        c["key"] = max(
+            variants,
+            key=lambda k: (sum(n * rf_fuzz.ratio(k, o) for o, n in variants.items()), variants[k], len(k)),
+        )
+        c["text"] = _merge_variants(c)
+        c["folded"] = _fold(ocr_key(c["text"]))
+
+    # fold captions that are substrings of a longer consensus line
+    clusters.sort(key=lambda c: -len(c["folded"]))
+    kept: List[Dict[str, Any]] = []
+    for c in clusters:
+        parent = next((k for k in kept if f" {c['folded']} " in f" {k['folded']} "), None)
+        if parent:
+            parent["confs"] += c["confs"]
+            parent["frames"] |= c["frames"]
+            parent["order"] = min(parent["order"], c["order"])
+        else:
+            kept.append(c)
+
+    kept.sort(key=lambda c: c["order"])
+    return [
+        {
+            "text": c["text"],
+            "confidence": round(sum(c["confs"]) / len(c["confs"]), 3),
+            "support": len(c["confs"]),
+            "frames": sorted(c["frames"]),
+        }
+        for c in kept
+    ]
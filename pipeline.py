@@ -1,4 +1,4 @@
-import os, json, subprocess, tempfile, shutil, glob
+import os, json, subprocess, tempfile, shutil, glob, wave
 from typing import Dict, Any, Tuple, List, Set
 from dataclasses import dataclass
 from pathlib import Path
@@ -7,16 +7,20 @@ import regex as re
 import pytesseract
 from PIL import Image
 import whisper
-from yt_dlp import YoutubeDL
+import ingest
 # imports for flags
 from flags import find_hits, PATTERNS, fuzzy_hits, embedding_hits
-from scorer import score_clip
+from scorer import ABSENCE_FLAGS, score_clip
 # imports for OCR and detection
 import uuid
 import shutil
 import cv2
 import numpy as np
 from logo_detector import LogoDetector
+from classifier import TranscriptClassifier
+from fingerprint import FingerprintIndex, fingerprint_clip
+from ocr_consensus import consolidate_ocr
+from model_registry import REGISTRY
 
 
 ARTIFACTS_DIR = Path(__file__).resolve().parent / "artifacts"
@@ -27,98 +31,133 @@ ARTIFACTS_DIR.mkdir(exist_ok=True)
 with open(os.path.join(os.path.dirname(__file__), "operators.json"), "r") as f:
     OPERATORS = json.load(f)
 
-# Initialize once (lazy in real app)
-_ASR = None
-_LOGO = None
+# Heavy models are loaded on demand through the registry (RAM budget, idle unloading)
+_FP_INDEX = None
 
-def _get_asr():
-    global _ASR
-    if _ASR is None:
-        # try "small" if your machine can handle; else keep "base"
-        _ASR = whisper.load_model(os.environ.get("WHISPER_MODEL", "base"))
-    return _ASR
+# Similarity above which a prior clip's transcript / OCR is reused
+DUP_AUDIO_SIM = float(os.environ.get("RG_DUP_AUDIO_SIM", "0.8"))
+DUP_FRAME_SIM = float(os.environ.get("RG_DUP_FRAME_SIM", "0.8"))
+# ...and the share of both clips the match has to span
+DUP_MIN_COVERAGE = float(os.environ.get("RG_DUP_MIN_COVERAGE", "0.8"))
 
 
-def _get_logo_detector():
-    global _LOGO
-    if _LOGO is None:
+def _load_logo_detector():
+    try:
+        return LogoDetector()
+    except Exception:
+        return None  # unavailable
+
+
+def _load_classifier():
+    # Only active when a trained model is configured: RG_CLASSIFIER_DIR=model_out_dir
+    model_dir = os.environ.get("RG_CLASSIFIER_DIR")
+    if not model_dir:
+        return None
+    backend = os.environ.get("RG_CLASSIFIER_BACKEND", "int8")
+    try:
+        return TranscriptClassifier(model_dir, backend=backend)
+    except Exception as e:
+        # configured explicitly, so failing to load is an error rather than "no classifier"
+        raise RuntimeError(
+            f"Could not load classifier from RG_CLASSIFIER_DIR={model_dir!r} (backend {backend!r}): {e}"
+        ) from e
+
+
+# try WHISPER_MODEL=small if your machine can handle it; else keep "base"
+REGISTRY.register("whisper", lambda: whisper.load_model(os.environ.get("WHISPER_MODEL", "base")))
+REGISTRY.register("logo", _load_logo_detector)
+REGISTRY.register("classifier", _load_classifier)
+
+
+def _get_fp_index():
+    global _FP_INDEX
+    if _FP_INDEX is None:
         try:
-            _LOGO = LogoDetector()
+            _FP_INDEX = FingerprintIndex(os.environ.get("RG_FINGERPRINT_DB", ARTIFACTS_DIR / "fingerprints.db"))
         except Exception:
-            _LOGO = False  # sentinel for unavailable
-    return _LOGO or None
-
-
-def download_youtube(url: str, out_dir: str) -> str:
-    # Normalize Shorts url to watch?v= form (more reliable)
-    if "youtube.com/shorts/" in url:
-        vid = url.rstrip("/").rsplit("/", 1)[-1].split("?")[0]
-        url = f"https://www.youtube.com/watch?v={vid}"
-
-    ydl_opts = {
-        "outtmpl": os.path.join(out_dir, "%(id)s.%(ext)s"),
-        # Prefer mp4+avc+aac (format 18) and fallbacks that avoid SABR-only streams
-        "format": "18/(bv*[vcodec^=avc1]/b)[height<=720]+(ba[acodec^=mp4a]/b)/b",
-        "quiet": True,
-        "noplaylist": True,
-        # try multiple player clients to avoid signature issues / SABR
-        "extractor_args": {"youtube": {"player_client": ["web", "ios", "android"]}},
-        "http_headers": {"User-Agent": "Mozilla/5.0"},
-    }
+            _FP_INDEX = False  # sentinel for unavailable
+    return _FP_INDEX or None
 
 
-    # Use your browser session if available (recommended)
-    # export YTDLP_BROWSER=chrome   (or safari/firefox/brave)
-    browser = os.environ.get("YTDLP_BROWSER")
-    if browser:
-        ydl_opts["cookiesfrombrowser"] = (browser,)
+def classify_texts(pairs: List[Tuple[str, str]]) -> List[Set[str] | None]:
+    """Classifier labels for (transcript, ocr_text) pairs in one batched pass.
 
-    # Or a cookies.txt file (avoids repeated Keychain prompts)
-    # export YTDLP_COOKIES=/path/to/youtube_cookies.txt
-    cookiefile = os.environ.get("YTDLP_COOKIES")
-    if cookiefile and os.path.exists(cookiefile):
-        ydl_opts["cookiefile"] = cookiefile
+    Returns ``None`` per pair when no classifier is configured.
+    """
+    with REGISTRY.use("classifier") as clf:
+        if not clf:
+            return [None] * len(pairs)
+        return clf.predict([f"{normalize(t)}\n{normalize(o)}" for t, o in pairs])
 
-    from yt_dlp import YoutubeDL
 
-    with YoutubeDL(ydl_opts) as ydl:
-        info = ydl.extract_info(url, download=True)
-        path = ydl.prepare_filename(info)
-        if not path.endswith(".mp4"):
-            base = os.path.splitext(path)[0]
-            mp4_path = base + ".mp4"
-            subprocess.run(["ffmpeg","-y","-i", path, "-c","copy", mp4_path], check=True)
-            path = mp4_path
-        return path
+def download_youtube(url: str, out_dir: str | None = None, audio_only: bool = False) -> str:
+    # Cached by video ID; out_dir overrides the shared ingest cache
+    return ingest.download(url, Path(out_dir) if out_dir else ingest.CACHE_DIR, audio_only=audio_only)
 
-def extract_audio(video_path: str, out_dir: str) -> str:
+def _clip_args(start: float | None, duration: float | None) -> Tuple[List[str], List[str]]:
+    # -ss before -i seeks by keyframe index instead of decoding up to `start`
+    args = ["-ss", f"{start:.3f}"] if start else []
+    return args, (["-t", f"{duration:.3f}"] if duration else [])
+
+def extract_audio(video_path: str, out_dir: str, start: float | None = None, duration: float | None = None) -> str:
     audio_path = os.path.join(out_dir, "audio.wav")
-    subprocess.run(["ffmpeg","-y","-i", video_path, "-ar","16000","-ac","1", audio_path], check=True)
+    pre, post = _clip_args(start, duration)
+    subprocess.run(["ffmpeg","-y", *pre, "-i", video_path, *post, "-ar","16000","-ac","1", audio_path], check=True)
     return audio_path
 
-def extract_frames(video_path: str, out_dir: str, fps: int = 1) -> List[str]:
+def extract_frames(
+    video_path: str, out_dir: str, fps: float = 1, start: float | None = None, duration: float | None = None
+) -> List[str]:
     frames_dir = os.path.join(out_dir, "frames")
     os.makedirs(frames_dir, exist_ok=True)
-    subprocess.run(["ffmpeg","-y","-i", video_path, "-vf", f"fps={fps}", os.path.join(frames_dir, "frame_%05d.jpg")], check=True)
+    pre, post = _clip_args(start, duration)
+    subprocess.run(["ffmpeg","-y", *pre, "-i", video_path, *post, "-vf", f"fps={fps}", os.path.join(frames_dir, "frame_%05d.jpg")], check=True)
     return sorted(glob.glob(os.path.join(frames_dir, "frame_*.jpg")))
+
+def probe_duration(video_path: str) -> float | None:
+    """Seconds, from the container or else the longest stream; None when unknown.
+
+    Live-recorded VODs often report ``N/A`` for the container duration.
+    """
+    for entry in ("format=duration", "stream=duration"):
+        out = subprocess.run(
+            ["ffprobe", "-v", "error", "-show_entries", entry, "-of", "csv=p=0", video_path],
+            check=True, capture_output=True, text=True,
+        ).stdout
+        values = []
+        for tok in out.split():
+            try:
+                values.append(float(tok.strip(",")))
+            except ValueError:
+                pass  # "N/A"
+        if values and max(values) > 0:
+            return max(values)
+    return None
+
+def _wav_frames(audio_path: str) -> int:
+    try:
+        with wave.open(audio_path, "rb") as w:
+            return w.getnframes()
+    except (OSError, EOFError, wave.Error):
+        return 0
 #gets decoding options
 def run_asr(audio_path: str) -> str:
-    asr = _get_asr()
-    result = asr.transcribe(
-        audio_path,
-        language="en",
-        fp16=False,
-        temperature=0.0,
-        no_speech_threshold=0.25,
-        logprob_threshold=-1.0,
-        best_of=5,
-        beam_size=5,
-    )
+    with REGISTRY.use("whisper") as asr:
+        result = asr.transcribe(
+            audio_path,
+            language="en",
+            fp16=False,
+            temperature=0.0,
+            no_speech_threshold=0.25,
+            logprob_threshold=-1.0,
+            best_of=5,
+            beam_size=5,
+        )
     return result.get("text","").strip()
 
 
-def _ocr_one_image(pil_img: Image.Image) -> str:
-    # Try multiple pre-process pipelines; keep best text
+def _ocr_reads(pil_img: Image.Image) -> List[Tuple[str, float]]:
+    # Try multiple pre-process pipelines; keep every read with its mean word confidence
     img = np.array(pil_img)
     if img.ndim == 3:
         gray = cv2.cvtColor(img, cv2.COLOR_RGB2GRAY)
@@ -139,9 +178,9 @@ def _ocr_one_image(pil_img: Image.Image) -> str:
         cfg = f'--oem 3 --psm {psm}'
         for mat in (norm, th1, th2):
             data = pytesseract.image_to_data(mat, output_type=pytesseract.Output.DICT, config=cfg)
-            words = [w for w, conf in zip(data["text"], data["conf"]) if w and str(conf).isdigit() and int(conf) >= 60]
-            if words:
-                texts.append(" ".join(words))
+            kept = [(w, int(conf)) for w, conf in zip(data["text"], data["conf"]) if w and str(conf).isdigit() and int(conf) >= 60]
+            if kept:
+                texts.append((" ".join(w for w, _ in kept), sum(c for _, c in kept) / (100.0 * len(kept))))
 
     # Whole image
     for psm in (6, 7, 11):  # block, single line, sparse text
@@ -156,11 +195,10 @@ def _ocr_one_image(pil_img: Image.Image) -> str:
         for psm in (6, 7, 11):
             ocr_with(region, psm)
 
-    # Return the best concatenation
-    return "\n".join(texts)
+    return texts
 
-def run_ocr_on_frames(frames):
-    texts = []
+def run_ocr_lines(frames) -> List[Dict[str, Any]]:
+    reads = []
     # Bias sampling toward the first 10 seconds plus mid/last frames
     sample_ids = set()
     for i, f in enumerate(frames):
@@ -168,16 +206,18 @@ def run_ocr_on_frames(frames):
             sample_ids.add(i)
     for i in sorted(sample_ids):
         try:
-            txt = _ocr_one_image(Image.open(frames[i]))
-            if txt:
-                texts.append(txt)
+            reads += [(i, t, conf) for t, conf in _ocr_reads(Image.open(frames[i]))]
         except pytesseract.TesseractNotFoundError as e:
             raise RuntimeError(
                 "Tesseract OCR executable not found. Install 'tesseract-ocr' to enable OCR processing"
             ) from e
         except Exception:
             pass
-    return "\n".join(texts)
+    return consolidate_ocr(reads)
+
+def run_ocr_on_frames(frames) -> str:
+    # One consensus line per caption instead of every variant of every frame
+    return "\n".join(line["text"] for line in run_ocr_lines(frames))
 
 
 def normalize(text: str) -> str:
@@ -202,6 +242,7 @@ def build_features(
     metadata: Dict[str, Any] = None,
     logos: Set[str] | None = None,
     use_embed: bool = True,
+    clf_labels: Set[str] | None = None,
 ) -> Dict[str, Any]:
 
     transcript_n = normalize(transcript)
@@ -246,27 +287,120 @@ def build_features(
         # YouTube unapproved ref heuristic (placeholder): operator is offshore and promo mentioned
         "unapproved_ref": (len(operators & {"bovada","stake","roobet","rainbet","rollbit"})>0) and ("promo" in phrases),
     }
+    if clf_labels:
+        merge_classifier_labels(features, clf_labels)
     return features, hits
 
-def process_video_file(video_path: str, use_embed: bool = True, use_logos: bool = True) -> Dict[str,Any]:
+
+def merge_classifier_labels(features: Dict[str, Any], labels: Set[str]) -> Dict[str, Any]:
+    # risk_free, chasing_losses and solve_financial_problems are scorer phrases;
+    # the other labels map onto the boolean features the scorer reads
+    features["phrases"] = set(features.get("phrases", set())) | set(labels)
+    if "vpn_proxy" in labels:
+        features["vpn_proxy"] = True
+    if "missing_disclaimer" in labels:
+        features["affiliate_undisclosed"] = True
+    if "offshore_reference" in labels:
+        features["offshore_reference"] = True
+    return features
+
+
+def apply_classifier(results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Batch-classify finished results in place and re-score them."""
+    labels = classify_texts([(r.get("transcript", ""), r.get("ocr_text", "")) for r in results])
+    for res, lbls in zip(results, labels):
+        if lbls:
+            merge_classifier_labels(res["features"], lbls)
+            res["overall"], res["categories"], res["flags"] = score_clip(res["features"])
+    return results
+
+def _detect_logos(frames) -> Set[str]:
+    with REGISTRY.use("logo") as detector:
+        if not detector:
+            return set()
+        try:
+            return detector.detect(frames)
+        except Exception:
+            return set()
+
+
+def _clip_features(
+    transcript: str,
+    ocr_text: str,
+    frames,
+    use_embed: bool = True,
+    use_logos: bool = True,
+    use_classifier: bool = True,
+    logos: Set[str] | None = None,
+):
+    """Logos (unless already known), classifier labels and features for one clip or window."""
+    if logos is None:
+        logos = _detect_logos(frames) if use_logos else set()
+    clf_labels = classify_texts([(transcript, ocr_text)])[0] if use_classifier else None
+    features, hits = build_features(
+        transcript, ocr_text, {}, logos=logos if use_logos else None, use_embed=use_embed, clf_labels=clf_labels
+    )
+    return features, hits, logos
+
+
+def _options_cover(stored: Dict[str, Any], wanted: Dict[str, Any]) -> bool:
+    # a result computed with a stage on also serves a request with it off
+    return all(stored.get(k, False) for k, on in wanted.items() if on)
+
+
+def _reuse_prior(match, video_path: str) -> Dict[str, Any]:
+    prior = dict(match.result)
+    prior["features"] = dict(prior.get("features", {}))
+    prior["features"]["phrases"] = set(prior["features"].get("phrases", []))
+    prior["duplicate_of"] = match.key
+    prior["video"] = video_path
+    return prior
+
+
+def process_video_file(
+    video_path: str,
+    use_embed: bool = True,
+    use_logos: bool = True,
+    use_classifier: bool = True,
+    dedup: bool = True,
+) -> Dict[str,Any]:
     with tempfile.TemporaryDirectory() as tdir:
         # copy to temp
         temp_video = os.path.join(tdir, "video.mp4")
         shutil.copy(video_path, temp_video)
         audio = extract_audio(temp_video, tdir)
         frames = extract_frames(temp_video, tdir, fps=1)
-        transcript = run_asr(audio)
-        ocr_text = run_ocr_on_frames(frames)
-        logos = set()
-
-        if use_logos:
-            detector = _get_logo_detector()
-            if detector:
-                try:
-                    logos = detector.detect(frames)
-                except Exception:
-                    logos = set()
-        features, hits = build_features(transcript, ocr_text, {}, logos=logos if use_logos else None, use_embed=use_embed)
+
+        # Near-duplicate check before ASR/OCR: same audio -> reuse transcript,
+        # same audio and frames -> reuse the whole result. Frames alone never
+        # stand in for OCR: a pHash barely sees caption text, so one channel
+        # template with different promo codes still matches.
+        index = _get_fp_index() if dedup else None
+        fp = match = None
+        if index:
+            try:
+                fp = fingerprint_clip(frames, audio)
+                match = index.lookup(fp)
+            except Exception:
+                index = None
+        # coverage keeps a short clip from standing in for a compilation that contains it
+        same_audio = bool(match) and match.audio_sim >= DUP_AUDIO_SIM and match.audio_cov >= DUP_MIN_COVERAGE
+        same_frames = bool(match) and match.frame_sim >= DUP_FRAME_SIM and match.frame_cov >= DUP_MIN_COVERAGE
+        options = {"use_embed": use_embed, "use_logos": use_logos, "use_classifier": use_classifier}
+        same_clip = same_audio and same_frames
+        if same_clip and _options_cover(match.options, options):
+            return _reuse_prior(match, video_path)
+
+        # same clip, run with fewer stages: reuse text and fill in what is missing
+        transcript = match.result.get("transcript", "") if same_audio else run_asr(audio)
+        ocr_lines = match.result.get("ocr_lines", []) if same_clip else run_ocr_lines(frames)
+        ocr_text = match.result.get("ocr_text", "") if same_clip else "\n".join(l["text"] for l in ocr_lines)
+        prior_logos = None
+        if same_clip and (match.options.get("use_logos") or not use_logos):
+            prior_logos = set(match.result.get("logos", []))
+        features, hits, logos = _clip_features(
+            transcript, ocr_text, frames, use_embed, use_logos, use_classifier, logos=prior_logos
+        )
 
         overall, cats, flags = score_clip(features)
 
@@ -288,7 +422,7 @@ def process_video_file(video_path: str, use_embed: bool = True, use_logos: bool
                 rep_paths.append(str(dst))
             reps = rep_paths
 
-        return {
+        result = {
             "overall": overall,
             "categories": cats,
             "flags": flags,
@@ -296,11 +430,197 @@ def process_video_file(video_path: str, use_embed: bool = True, use_logos: bool
             "hits": hits,
             "transcript": transcript,
             "ocr_text": ocr_text,
+            "ocr_lines": ocr_lines,
             "logos": list(logos),
             "rep_frames": reps,
         }
+        if match and same_audio:
+            result["partial_duplicate_of"] = match.key
+        if index:
+            try:
+                index.add(fp, result, key=video_path, options=options)
+            except Exception:
+                pass
+        return result
+
+def _accumulate(acc: Dict[str, Any], features: Dict[str, Any], disclosed: bool) -> Dict[str, Any]:
+    """Fold one window's features into whole-video features (bounded state)."""
+    acc["phrases"] = acc.get("phrases", set()) | set(features["phrases"])
+    operators = set(acc.get("operators", [])) | set(features["operators"])
+    acc["operators"] = sorted(operators)
+    for key, value in features.items():
+        if isinstance(value, bool):
+            acc[key] = acc.get(key, False) or value
+    acc["disclosed"] = acc.get("disclosed", False) or disclosed
+    # cross-window rules: a promo in one window and #ad in another is disclosed
+    acc["affiliate_undisclosed"] = (("promo" in acc["phrases"]) and not acc["disclosed"]) or "missing_disclaimer" in acc["phrases"]
+    acc["unapproved_ref"] = bool(operators & {"bovada","stake","roobet","rainbet","rollbit"}) and ("promo" in acc["phrases"])
+    return acc
+
+
+def process_video_stream(
+    video_path: str,
+    window_s: float = 60.0,
+    overlap_s: float = 2.0,
+    ocr_every_s: int = 5,
+    use_embed: bool = True,
+    use_logos: bool = True,
+    use_classifier: bool = True,
+):
+    """Process a long video in fixed time windows, yielding results as it goes.
+
+    Each window gets its own ASR/OCR/logo pass in a scratch dir that is removed
+    before the next one, so memory and disk stay constant however long the
+    video is. Yields ``{"type": "window", ...}`` per window (its text, the
+    flags raised by what it contains, and the running score) and a final
+    ``{"type": "final", ...}`` with the whole-video score and flags, and the
+    window start times at which each content flag fired.
+    """
+    # None: length unknown, read windows until ffmpeg returns nothing
+    duration = probe_duration(video_path)
+    acc: Dict[str, Any] = {}
+    flag_times: Dict[str, List[float]] = {}
+    run_dir = None
+    start = 0.0
+    while duration is None or start < duration:
+        length = window_s + overlap_s if duration is None else min(window_s + overlap_s, duration - start)
+        with tempfile.TemporaryDirectory() as tdir:
+            audio = extract_audio(video_path, tdir, start=start, duration=length)
+            frames = extract_frames(video_path, tdir, fps=1.0 / max(1, ocr_every_s), start=start, duration=length)
+            if duration is None:
+                samples = _wav_frames(audio)
+                if not samples and not frames:
+                    duration = start
+                    break
+                if samples < 16000 * (length - 1.0):
+                    # short final window: this is where the video ends
+                    duration = start + samples / 16000.0
+            transcript = run_asr(audio)
+            ocr_text = run_ocr_on_frames(frames)
+            features, hits, logos = _clip_features(
+                transcript, ocr_text, frames, use_embed, use_logos, use_classifier
+            )
+            # absence flags ("missing_helpline") are only decided for the whole video
+            win_flags = [f for f in score_clip(features)[2] if f[1] not in ABSENCE_FLAGS]
+            disclosed = bool(re.search(r"#(ad|sponsored)\b", f"{transcript}\n{ocr_text}", re.I))
+            _accumulate(acc, features, disclosed)
+            overall, cats, flags = score_clip(acc)
+
+            new_flags = [f for f in win_flags if f[1] not in flag_times]
+            for _, name in win_flags:
+                flag_times.setdefault(name, []).append(round(start, 1))
+
+            # keep one frame per window that raised a new flag, as evidence
+            rep = None
+            if new_flags and frames:
+                if run_dir is None:
+                    run_dir = ARTIFACTS_DIR / f"run_{uuid.uuid4().hex[:8]}"
+                    run_dir.mkdir(exist_ok=True)
+                rep = str(run_dir / f"t{int(start):06d}.jpg")
+                shutil.copyfile(frames[len(frames) // 2], rep)
+
+        yield {
+            "type": "window",
+            "start": start,
+            "end": min(start + length, duration or start + length),
+            "transcript": transcript,
+            "ocr_text": ocr_text,
+            "logos": sorted(logos),
+            "flags": win_flags,
+            "new_flags": new_flags,
+            "rep_frame": rep,
+            "overall": overall,
+            "categories": cats,
+        }
+        start += window_s
+
+    overall, cats, flags = score_clip(acc)
+    yield {
+        "type": "final",
+        "duration": duration,
+        "overall": overall,
+        "categories": cats,
+        "flags": flags,
+        "features": {k: v for k, v in acc.items() if k != "disclosed"},
+        "flag_times": flag_times,
+    }
+
+
+def process_long_video(video_path: str, on_window=None, **kwargs) -> Dict[str, Any]:
+    """Run `process_video_stream` to completion; ``on_window`` sees each partial result."""
+    final: Dict[str, Any] = {}
+    for part in process_video_stream(video_path, **kwargs):
+        if part["type"] == "final":
+            final = part
+        elif on_window:
+            on_window(part)
+    return final
+
 
 def process_youtube(url: str) -> Dict[str,Any]:
+    path = download_youtube(url)
+    return process_video_file(path)
+
+
+def triage_metadata(meta: Dict[str, Any]) -> Dict[str, Any]:
+    """Cheap rules over title/description/hashtags, before any bytes are fetched."""
+    text = normalize(ingest.metadata_text(meta))
+    hits = find_hits(text)
+    return {
+        "video_id": meta.get("id"),
+        "phrases": sorted(hits.keys()),
+        "operators": sorted(detect_operators(text)),
+        "duration": meta.get("duration"),
+    }
+
+
+def triage_youtube(url: str) -> Dict[str, Any]:
+    """Transcript-first triage: metadata rules plus ASR on the audio track only."""
+    meta = ingest.fetch_metadata(url)
+    audio_src = download_youtube(url, audio_only=True)
     with tempfile.TemporaryDirectory() as tdir:
-        path = download_youtube(url, tdir)
-        return process_video_file(path)
+        transcript = run_asr(extract_audio(audio_src, tdir))
+    features, hits = build_features(transcript, ingest.metadata_text(meta), use_embed=False)
+    overall, cats, flags = score_clip(features)
+    return {
+        "overall": overall,
+        "categories": cats,
+        "flags": flags,
+        "features": features,
+        "hits": hits,
+        "transcript": transcript,
+        "metadata": meta,
+    }
+
+
+def process_youtube_many(
+    urls: List[str], workers: int = 4, audio_only: bool = False, use_classifier: bool = True
+) -> Dict[str, Any]:
+    """Download ``urls`` concurrently, then analyze each as its file lands.
+
+    With ``audio_only`` each clip goes through `triage_youtube` instead of the
+    full video pipeline. The classifier (if configured) runs once over all
+    clips at the end. Failed downloads map to their exception.
+    """
+    from concurrent.futures import ThreadPoolExecutor, as_completed
+
+    urls = list(dict.fromkeys(urls))
+    # one download + analysis per video, however many URL forms point at it
+    first: Dict[str, str] = {}
+    for u in urls:
+        first.setdefault(ingest.dedup_key(u), u)
+
+    done: Dict[str, Any] = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futs = {pool.submit(download_youtube, u, None, audio_only): u for u in first.values()}
+        for fut in as_completed(futs):
+            url = futs[fut]
+            try:
+                path = fut.result()
+                done[url] = triage_youtube(url) if audio_only else process_video_file(path, use_classifier=False)
+            except Exception as e:
+                done[url] = e
+    results = {u: done[first[ingest.dedup_key(u)]] for u in urls}
+    if use_classifier:
+        apply_classifier([r for r in done.values() if isinstance(r, dict)])
+    return results
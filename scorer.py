@@ -17,6 +17,10 @@ WEIGHTS: Dict[str, int] = {
     "undisclosed_affiliate": 12,
 }
 
+# Raised by something *missing* (helpline, 21+, terms, #ad); only meaningful
+# for a whole clip, not for a window of a longer video
+ABSENCE_FLAGS = {"missing_helpline", "missing_21plus", "missing_terms", "undisclosed_affiliate"}
+
 def score_clip(features: Dict) -> Tuple[int, Dict[str,int], List[Tuple[str,str]]]:
     weights = WEIGHTS
 
@@ -60,7 +64,7 @@ def score_clip(features: Dict) -> Tuple[int, Dict[str,int], List[Tuple[str,str]]
         flags.append(("rgmsg","missing_terms")); s_cat["rgmsg"] += weights["missing_terms"]
 
     # Offshore / availability
-    if ops & {"bovada","stake","roobet","rainbet","rollbit"}:
+    if ops & {"bovada","stake","roobet","rainbet","rollbit"} or features.get("offshore_reference"):
         flags.append(("offshore","offshore_brand")); s_cat["offshore"] += weights["offshore_brand"]
     if features.get("vpn_proxy"): 
         flags.append(("offshore","vpn_proxy")); s_cat["offshore"] += weights["vpn_proxy"]
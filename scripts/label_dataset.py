@@ -1,15 +1,21 @@
 import argparse
+import hashlib
 import json
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, List, Set
 
 from pipeline import process_video_file
+from dataset_store import DatasetStore, is_store_path
 
 from scorer import WEIGHTS
 
 # Use flags defined in scorer to keep labeling options in sync
 LABELS = sorted(WEIGHTS.keys())
 
+VIDEO_EXTS = {".mp4", ".mov", ".mkv", ".webm"}
+
 def _summarize_ocr(text: str, operators: List[str]) -> str:
     lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
     keywords = [op.lower() for op in operators] + ["21", "gambl", "stake", "rainbet", "bovada", "roobet"]
@@ -17,18 +23,38 @@ def _summarize_ocr(text: str, operators: List[str]) -> str:
     return "\n".join(key_lines[:10])
 
 
-def label_video(video: str, out_file: Path, fast: bool = False) -> None:
-    """Process a video and prompt the user for RG flags.
+def _precompute(video: str, fast: bool = False, cache_dir: Path | None = None) -> Dict[str, object]:
+    """Run the pipeline and keep only what the annotator sees.
 
-    The transcript and OCR text are printed to the console so the annotator can
-    make a decision without watching the full video.
+    With ``cache_dir`` the result is persisted per video, so a crashed or
+    interrupted session does not redo finished clips.
     """
+    cache_path = None
+    if cache_dir is not None:
+        key = hashlib.sha1(f"{Path(video).resolve()}:{fast}".encode()).hexdigest()[:16]
+        cache_path = cache_dir / f"{key}.json"
+        if cache_path.exists():
+            return json.loads(cache_path.read_text())
 
     result = process_video_file(video, use_embed=not fast, use_logos=not fast)
-    transcript = result.get("transcript", "")
-    ocr_text = result.get("ocr_text", "")
-    operators = result.get("features", {}).get("operators", [])
-    hits = result.get("hits", {})
+    pre = {
+        "transcript": result.get("transcript", ""),
+        "ocr_text": result.get("ocr_text", ""),
+        "operators": sorted(result.get("features", {}).get("operators", [])),
+        "phrases": sorted(result.get("hits", {}).keys()),
+    }
+    if cache_path is not None:
+        tmp = cache_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(pre))
+        tmp.replace(cache_path)
+    return pre
+
+
+def _prompt_and_save(video: str, pre: Dict[str, object], out_file: Path) -> None:
+    transcript = pre["transcript"]
+    ocr_text = pre["ocr_text"]
+    operators = pre["operators"]
+    phrases = pre["phrases"]
 
     print("\n=== Transcript ===\n", transcript)
     if ocr_text:
@@ -36,9 +62,9 @@ def label_video(video: str, out_file: Path, fast: bool = False) -> None:
         if summary:
             print("\n=== OCR Snippets ===\n", summary)
     if operators:
-        print("\nDetected operators:", ", ".join(sorted(operators)))
-    if hits:
-        print("Detected phrases:", ", ".join(sorted(hits.keys())))
+        print("\nDetected operators:", ", ".join(operators))
+    if phrases:
+        print("Detected phrases:", ", ".join(phrases))
 
 
     print("\nEnter comma-separated flags from:\n" + ", ".join(LABELS))
@@ -53,20 +79,139 @@ def label_video(video: str, out_file: Path, fast: bool = False) -> None:
         "video": video,
         "transcript": transcript,
         "ocr_text": ocr_text,
+        "operators": operators,
         "flags": flagged,
     }
-    with out_file.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(entry) + "\n")
+    if is_store_path(out_file):
+        with DatasetStore(out_file) as store:
+            if not store.add(entry):
+                print(f"Same content already in {out_file}; not added again")
+                return
+    else:
+        with out_file.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(entry) + "\n")
     print(f"Saved labels to {out_file}")
 
 
+def label_video(video: str, out_file: Path, fast: bool = False) -> None:
+    """Process a video and prompt the user for RG flags.
+
+    The transcript and OCR text are printed to the console so the annotator can
+    make a decision without watching the full video.
+    """
+    _prompt_and_save(video, _precompute(video, fast), out_file)
+
+
+def _labeled_videos(out_file: Path) -> Set[str]:
+    done: Set[str] = set()
+    if is_store_path(out_file):
+        with DatasetStore(out_file) as store:
+            done.update(store.videos())
+    elif out_file.exists():
+        with out_file.open(encoding="utf-8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["video"])
+                except (ValueError, KeyError):
+                    continue
+    # compare on one form: clips/x.mp4, ./clips/x.mp4 and /abs/clips/x.mp4 are the same video
+    return {_video_key(v) for v in done}
+
+
+def _video_key(video: str) -> str:
+    return str(Path(video).resolve())
+
+
+def expand_inputs(inputs: Iterable[str]) -> List[str]:
+    """Videos from paths, directories (scanned for video files) and .txt lists."""
+    videos: List[str] = []
+    for item in inputs:
+        p = Path(item)
+        if p.is_dir():
+            videos += [str(v) for v in sorted(p.iterdir()) if v.suffix.lower() in VIDEO_EXTS]
+        elif p.suffix.lower() == ".txt":
+            videos += [ln.strip() for ln in p.read_text().splitlines() if ln.strip()]
+        else:
+            videos.append(item)
+    return list(dict.fromkeys(videos))
+
+
+def label_session(
+    videos: List[str],
+    out_file: Path,
+    fast: bool = False,
+    prefetch: int = 3,
+    workers: int = 1,
+    cache_dir: Path | None = None,
+) -> None:
+    """Label ``videos`` one by one while the next ``prefetch`` are processed.
+
+    Videos already in ``out_file`` are skipped (compared as resolved paths,
+    which is also how new entries are recorded), so re-running the command
+    resumes a session.
+
+    On Ctrl-C, queued clips are cancelled, but a clip already inside the
+    pipeline (ffmpeg/Whisper/Tesseract) cannot be interrupted: the process
+    exits once it finishes, and its result is cached for the next run.
+    """
+    done = _labeled_videos(out_file)
+    todo = list(dict.fromkeys(_video_key(v) for v in videos if _video_key(v) not in done))
+    skipped = len({_video_key(v) for v in videos}) - len(todo)
+    if skipped:
+        print(f"Skipping {skipped} already labeled video(s)")
+    if not todo:
+        return
+    cache_dir = cache_dir or out_file.parent / f".{out_file.stem}_precomputed"
+    cache_dir.mkdir(parents=True, exist_ok=True)
+
+    pending = iter(todo)
+    queue: deque = deque()
+    pool = ThreadPoolExecutor(max_workers=max(1, workers))
+
+    def top_up(size: int) -> None:
+        while len(queue) < size:
+            video = next(pending, None)
+            if video is None:
+                return
+            queue.append((video, pool.submit(_precompute, video, fast, cache_dir)))
+
+    try:
+        top_up(prefetch + 1)  # first clip + `prefetch` ahead of it
+        n = 0
+        while queue:
+            video, fut = queue.popleft()
+            top_up(prefetch)  # `prefetch` clips ahead of the one being labeled
+            n += 1
+            print(f"\n##### [{n}/{len(todo)}] {video}")
+            try:
+                pre = fut.result()
+            except Exception as e:
+                print(f"Skipping {video}: {e}")
+                continue
+            _prompt_and_save(video, pre, out_file)
+    except (KeyboardInterrupt, EOFError):
+        print("\nSession stopped; finishing the clip in progress before exit. Re-run the same command to resume.")
+    finally:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
 def main() -> None:
-    p = argparse.ArgumentParser(description="Label a video for RG violations")
-    p.add_argument("video", help="Path to mp4 file")
-    p.add_argument("out", help="Path to output JSONL file")
+    p = argparse.ArgumentParser(description="Label videos for RG violations")
+    p.add_argument("videos", nargs="+", help="mp4 files, directories of videos, or .txt lists of paths")
+    p.add_argument("out", help="Output .db store (see dataset_store.py) or JSONL file")
     p.add_argument("--fast", action="store_true", help="Skip heavy embed and logo models for speed")
+    p.add_argument("--prefetch", type=int, default=3, help="Clips to process ahead of the annotator (default: 3)")
+    p.add_argument("--workers", type=int, default=1, help="Background pipeline workers (default: 1)")
+    p.add_argument("--cache-dir", type=Path, default=None, help="Where precomputed results are kept (default: next to out)")
     args = p.parse_args()
-    label_video(args.video, Path(args.out), fast=args.fast)
+    label_session(
+        expand_inputs(args.videos),
+        Path(args.out),
+        fast=args.fast,
+        prefetch=args.prefetch,
+        workers=args.workers,
+        cache_dir=args.cache_dir,
+    )
 
 
 if __name__ == "__main__":
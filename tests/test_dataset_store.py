@@ -0,0 +1,45 @@
+import json
+
+from dataset_store import DatasetStore, content_hash, is_store_path
+
+
+def test_migrate_dedups_and_queries_case_insensitively(tmp_path):
+    rows = [
+        {"video": "a.mp4", "transcript": "Use code X", "ocr_text": "stake.com",
+         "flags": {"offshore_brand": True}, "operators": ["Stake"]},
+        # same content, different spacing/case: deduplicated
+        {"video": "b.mp4", "transcript": "use code  x", "ocr_text": "STAKE.com", "flags": {"offshore_brand": True}},
+        {"video": "c.mp4", "transcript": "hello", "ocr_text": "", "flags": {}},
+    ]
+    jsonl = tmp_path / "dataset.jsonl"
+    jsonl.write_text("".join(json.dumps(r) + "\n" for r in rows))
+
+    with DatasetStore(tmp_path / "dataset.db") as store:
+        assert store.migrate_jsonl(jsonl) == 2
+        assert store.migrate_jsonl(jsonl) == 0
+        assert [r["video"] for r in store.query(flag="offshore_brand")] == ["a.mp4"]
+        assert [r["video"] for r in store.query(operator="stake")] == ["a.mp4"]
+        assert [r["video"] for r in store.query(operator="Stake")] == ["a.mp4"]
+        assert store.has_video("c.mp4")
+
+
+def test_is_store_path():
+    assert is_store_path("x.db") and is_store_path("x.SQLite")
+    assert not is_store_path("x.jsonl")
+
+
+def test_textless_clips_are_kept_per_video(tmp_path):
+    video = tmp_path / "a.mp4"
+    video.write_bytes(b"\x00" * 16)
+    rows = [
+        {"video": str(video), "flags": {"offshore_brand": True}},
+        {"video": str(tmp_path / "b.mp4"), "flags": {"offshore_brand": True}},
+    ]
+    # hash does not depend on whether the file is on disk
+    assert content_hash({"video": str(video), "transcript": "hi"}) == content_hash({"transcript": "hi"})
+
+    with DatasetStore(tmp_path / "dataset.db") as store:
+        rev = store.revision()
+        assert store.add_many(rows) == 2
+        assert store.add_many(rows) == 0
+        assert store.revision() != rev
@@ -0,0 +1,37 @@
+import random
+
+from fingerprint import Fingerprint, FingerprintIndex, audio_similarity, frame_similarity
+
+
+def _words(rng, n, bits):
+    return [rng.getrandbits(bits) for _ in range(n)]
+
+
+def test_short_clip_inside_compilation_has_low_coverage(tmp_path):
+    rng = random.Random(0)
+    short = Fingerprint(frames=_words(rng, 10, 64), audio=_words(rng, 100, 32))
+    long_ = Fingerprint(
+        frames=_words(rng, 25, 64) + short.frames + _words(rng, 25, 64),
+        audio=_words(rng, 250, 32) + short.audio + _words(rng, 250, 32),
+    )
+    index = FingerprintIndex(tmp_path / "fp.db")
+    index.add(short, {"transcript": "short ad"}, key="short", options={"use_embed": True})
+
+    match = index.lookup(long_)
+    assert match.key == "short"
+    assert match.frame_sim == 1.0 and match.audio_sim == 1.0
+    assert match.frame_cov < 0.2 and match.audio_cov < 0.2
+    assert match.options == {"use_embed": True}
+
+
+def test_reupload_with_noise_matches_with_full_coverage():
+    rng = random.Random(1)
+    frames = _words(rng, 30, 64)
+    audio = _words(rng, 300, 32)
+    noisy_frames = [h ^ (1 << rng.randrange(64)) for h in frames]
+    noisy_audio = [w ^ (1 << rng.randrange(32)) if i % 3 else w for i, w in enumerate(audio)]
+
+    sim, cov = frame_similarity(noisy_frames, frames)
+    assert sim == 1.0 and cov == 1.0
+    sim, cov = audio_similarity(noisy_audio, audio)
+    assert sim > 0.95 and cov == 1.0
@@ -0,0 +1,100 @@
+import time
+from pathlib import Path
+
+import pytest
+
+import ingest
+
+
+class FakeYDL:
+    """Local stand-in for yt_dlp.YoutubeDL; writes a small file instead of downloading."""
+
+    calls = []
+
+    def __init__(self, opts):
+        self.opts = opts
+
+    def extract_info(self, url, download=True):
+        vid = ingest.video_id(url)
+        if vid is None or vid.startswith("broken"):
+            raise RuntimeError(f"unavailable: {url}")
+        FakeYDL.calls.append((vid, download, self.opts["outtmpl"]))
+        info = {
+            "id": vid,
+            "ext": "m4a" if self.opts["format"] == ingest.AUDIO_FORMAT else "mp4",
+            "title": "Huge win #stake",
+            "description": "use code WIN #ad",
+            "duration": 42,
+            "tags": ["casino"],
+        }
+        if download:
+            Path(self.prepare_filename(info)).write_bytes(b"media")
+        return info
+
+    def prepare_filename(self, info):
+        return self.opts["outtmpl"] % {"id": info["id"], "ext": info["ext"]}
+
+
+@pytest.fixture(autouse=True)
+def _reset_fake():
+    FakeYDL.calls = []
+    ingest._TLS.ydls = {}
+
+
+def _no_wait():
+    return ingest.HostRateLimiter(0)
+
+
+def test_download_cache_hit_skips_extract_info(tmp_path):
+    url = "https://www.youtube.com/watch?v=abcdef123"
+    first = ingest.download(url, tmp_path, limiter=_no_wait(), ydl_factory=FakeYDL)
+    second = ingest.download(url, tmp_path, limiter=_no_wait(), ydl_factory=FakeYDL)
+    assert first == second == str(tmp_path / "abcdef123.mp4")
+    assert len(FakeYDL.calls) == 1
+
+
+def test_metadata_pass_does_not_download(tmp_path):
+    meta = ingest.fetch_metadata(
+        "https://www.youtube.com/shorts/abcdef123", tmp_path, limiter=_no_wait(), ydl_factory=FakeYDL
+    )
+    assert FakeYDL.calls == [("abcdef123", False, str(tmp_path / "%(id)s.%(ext)s"))]
+    assert meta["duration"] == 42
+    assert meta["hashtags"] == ["ad", "stake"]
+    assert not list(tmp_path.glob("abcdef123.mp4"))
+    # served from the metadata cache the second time
+    ingest.fetch_metadata("https://youtu.be/abcdef123", tmp_path, limiter=_no_wait(), ydl_factory=FakeYDL)
+    assert len(FakeYDL.calls) == 1
+
+
+def test_audio_only_outtmpl_and_path(tmp_path):
+    path = ingest.download(
+        "https://www.youtube.com/watch?v=abcdef123", tmp_path, audio_only=True, limiter=_no_wait(), ydl_factory=FakeYDL
+    )
+    assert FakeYDL.calls[0][2] == str(tmp_path / "%(id)s.audio.%(ext)s")
+    assert path == str(tmp_path / "abcdef123.audio.m4a")
+    # audio cache does not satisfy a video request
+    ingest.download("https://www.youtube.com/watch?v=abcdef123", tmp_path, limiter=_no_wait(), ydl_factory=FakeYDL)
+    assert len(FakeYDL.calls) == 2
+
+
+def test_host_rate_limiter_spaces_same_host_only():
+    limiter = ingest.HostRateLimiter(0.2)
+    t0 = time.monotonic()
+    limiter.wait("https://www.youtube.com/watch?v=a")
+    limiter.wait("https://other.example/x")
+    assert time.monotonic() - t0 < 0.1
+    limiter.wait("https://www.youtube.com/watch?v=b")
+    limiter.wait("https://www.youtube.com/watch?v=c")
+    assert time.monotonic() - t0 >= 0.4
+
+
+def test_download_many_maps_failures_and_dedups_by_video_id(tmp_path):
+    urls = [
+        "https://www.youtube.com/shorts/abcdef123",
+        "https://www.youtube.com/watch?v=abcdef123",
+        "https://www.youtube.com/watch?v=broken1234",
+    ]
+    results = ingest.download_many(urls, tmp_path, workers=3, limiter=_no_wait(), ydl_factory=FakeYDL)
+    assert results[urls[0]] == results[urls[1]] == str(tmp_path / "abcdef123.mp4")
+    assert isinstance(results[urls[2]], RuntimeError)
+    assert [c[0] for c in FakeYDL.calls] == ["abcdef123"]
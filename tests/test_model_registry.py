@@ -0,0 +1,58 @@
+import model_registry
+from model_registry import ModelRegistry
+
+MB = 2**20
+
+
+def _registry(monkeypatch, loaded):
+    monkeypatch.setattr(model_registry, "_rss_bytes", lambda: 0)
+    monkeypatch.setattr(model_registry, "model_bytes", lambda obj: 60 * MB)
+    reg = ModelRegistry(budget_mb=100)
+
+    def loader(name):
+        def load():
+            # what else is resident at the moment this model's weights arrive
+            loaded[name] = [n for n, e in reg._entries.items() if e.loaded]
+            return object()
+        return load
+
+    reg.register("a", loader("a"))
+    reg.register("b", loader("b"))
+    return reg
+
+
+def test_reload_evicts_before_calling_loader(monkeypatch):
+    loaded = {}
+    reg = _registry(monkeypatch, loaded)
+    reg.get("a")
+    reg.get("b")  # size unknown until loaded: "a" is evicted afterwards
+    assert reg.report()["a"]["loaded"] is False
+
+    reg.get("a")  # known 60 MB: "b" goes first
+    assert loaded["a"] == []
+    assert reg.resident_bytes() == 60 * MB
+
+
+def test_pinned_model_is_not_evicted(monkeypatch):
+    reg = _registry(monkeypatch, {})
+    with reg.use("a") as a:
+        assert reg.get("b") is not None
+        assert reg.report()["a"]["loaded"] is True
+    # unpinning brings the registry back under budget
+    assert reg.resident_bytes() == 60 * MB
+
+
+def test_host_pressure_does_not_evict_recently_used(monkeypatch):
+    reg = _registry(monkeypatch, {})
+    reg.budget = 0
+    reg.min_free = 1024 * MB
+    monkeypatch.setattr(model_registry, "_available_bytes", lambda: 512 * MB)
+    with reg.use("a"):
+        pass
+    reg.get("b")
+    reg.reap()
+    assert reg.report()["a"]["loaded"] and reg.report()["b"]["loaded"]
+
+    reg.min_resident_s = 0
+    reg.reap()
+    assert not reg.report()["a"]["loaded"] and not reg.report()["b"]["loaded"]
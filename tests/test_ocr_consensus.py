@@ -0,0 +1,28 @@
+from ocr_consensus import consolidate_ocr
+
+
+def _texts(reads):
+    return [line["text"] for line in consolidate_ocr([(i, t, 0.9) for i, t in enumerate(reads)])]
+
+
+def test_words_seen_in_some_reads_are_kept():
+    out = _texts(["huge win use code WIN", "huge win use code WIN", "huge win use code WIN #ad"])
+    assert out == ["huge win use code WIN #ad"]
+    out = _texts(["bet from anywhere play with", "bet from anywhere play with", "bet from anywhere play with vpn"])
+    assert out == ["bet from anywhere play with vpn"]
+
+
+def test_different_promo_codes_stay_apart():
+    assert _texts(["Use code STAKE20", "USE CODE STAKE50"]) == ["Use code STAKE20", "USE CODE STAKE50"]
+
+
+def test_digit_misreads_join_their_caption():
+    lines = consolidate_ocr([(0, "use code stake20", 0.9), (1, "use c0de stake20", 0.7), (2, "use code stake20", 0.9)])
+    assert len(lines) == 1
+    assert lines[0]["text"] == "use code stake20"
+    assert lines[0]["support"] == 3 and lines[0]["frames"] == [0, 1, 2]
+
+
+def test_contained_caption_folds_into_longer_one():
+    out = _texts(["21+ only", "21+ ONLY. Gamble responsibly", "visit stake.com"])
+    assert out == ["21+ ONLY. Gamble responsibly", "visit stake.com"]